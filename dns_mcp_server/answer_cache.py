@@ -0,0 +1,90 @@
+"""
+TTL-bounded DNS answer cache
+Keeps recently resolved answers in memory so repeat lookups skip the network
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class TTLCache:
+    """
+    Size-bounded cache whose entries expire after a per-entry TTL
+
+    Entries are evicted least-recently-used first once the cache is full.
+    Expiry uses the monotonic clock so wall-clock adjustments cannot extend or
+    cut short an entry's lifetime.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        default_ttl: float = 300.0,
+        max_ttl: float = 3600.0,
+        min_ttl: float = 0.0,
+    ):
+        """
+        Initialize answer cache
+
+        Args:
+            maxsize: Maximum number of cached entries
+            default_ttl: Lifetime in seconds for entries stored without a TTL
+            max_ttl: Upper bound in seconds applied to every entry's TTL
+            min_ttl: Lower bound in seconds applied to every positive TTL
+        """
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.min_ttl = min_ttl
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any) -> Any | None:
+        """
+        Get a fresh cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expiry, value = entry
+        if time.monotonic() >= expiry:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any, ttl: float | None = None):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Lifetime in seconds (default_ttl if None, clamped to
+                [min_ttl, max_ttl]); a TTL of zero or less is not cached
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl <= 0:
+            return
+        ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -5,15 +5,85 @@ High-performance concurrent DNS queries with rate limiting
 
 import asyncio
 import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
 
-import dns.reversename
-
+from .config import config, validate_record_type
 from .formatters import format_bulk_response, format_error_response
 from .param_utils import ensure_int
-from .resolvers import create_resolver
+from .resolvers import create_resolver, reverse_domain_name
 from .server import mcp
 
 
+@dataclass(slots=True)
+class DomainResult:
+    """
+    Outcome of a single domain query within a bulk run
+
+    Slotted to keep per-domain overhead low on large batches; converted to the
+    response dict shape with as_dict() when the bulk response is assembled.
+    """
+
+    domain: str
+    record_type: str
+    query_time_seconds: float
+    records: list[str] | None = None
+    error: dict[str, Any] | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result in the bulk response format"""
+        if self.error is not None:
+            return {
+                "domain": self.domain,
+                "record_type": self.record_type,
+                "query_time_seconds": self.query_time_seconds,
+                "error": self.error,
+            }
+        return {
+            "domain": self.domain,
+            "record_type": self.record_type,
+            "records": self.records,
+            "record_count": len(self.records),
+            "query_time_seconds": self.query_time_seconds,
+        }
+
+
+async def run_bounded(
+    handler: Callable[..., Awaitable[Any]],
+    jobs: list[tuple],
+    limit: int,
+    on_error: Callable[[tuple, Exception], Any],
+) -> list[Any]:
+    """
+    Run jobs concurrently with at most ``limit`` handlers in flight
+
+    A shared semaphore bounds concurrency and gather collects results, so there
+    is no queue hand-off per job and no worker shutdown to manage.
+
+    Args:
+        handler: Coroutine function called as ``handler(*job)``
+        jobs: Argument tuples, one per job
+        limit: Maximum number of handlers running at once
+        on_error: Builds the result for a job whose handler raised unexpectedly,
+            called as ``on_error(job, exception)``
+
+    Returns:
+        Results in job order
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run_job(job: tuple) -> Any:
+        """Run one job once a semaphore slot is free"""
+        async with semaphore:
+            try:
+                return await handler(*job)
+            except Exception as e:
+                return on_error(job, e)
+
+    return await asyncio.gather(*(run_job(job) for job in jobs))
+
+
 @mcp.tool()
 async def dns_bulk_query(
     domains: list[str],
@@ -22,6 +92,7 @@ async def dns_bulk_query(
     resolver_type: str = "system",
     timeout: int = 10,
     max_workers: int = 10,
+    columnar: bool = False,
 ) -> dict:
     """
     Perform concurrent bulk DNS queries for multiple domains
@@ -33,15 +104,39 @@ async def dns_bulk_query(
         resolver_type: Predefined resolver type (system, public, google, cloudflare, quad9, opendns)
         timeout: Query timeout in seconds
         max_workers: Maximum concurrent queries (default: 10)
+        columnar: Return results as parallel per-field lists under "columns"
+            instead of one dict per domain under "results" (lighter for large
+            batches)
 
     Returns:
         Dictionary with bulk query results
     """
-    if not domains:
+    # Validate once up front; the uppercased type is reused for every domain
+    try:
+        record_type_upper = validate_record_type(record_type)
+    except ValueError as e:
         return {
             "bulk_query": True,
             "record_type": record_type.upper(),
+            "nameserver": nameserver,
+            "domain_count": len(domains),
+            "unique_domain_count": len(set(domains)),
+            "successful_queries": 0,
+            "failed_queries": len(domains),
+            "total_query_time_seconds": 0.0,
+            "average_query_time_seconds": 0.0,
+            "results": [],
+            "error": format_error_response(
+                e, context={"record_type": record_type, "operation": "bulk_query"}
+            ),
+        }
+
+    if not domains:
+        return {
+            "bulk_query": True,
+            "record_type": record_type_upper,
             "domain_count": 0,
+            "unique_domain_count": 0,
             "successful_queries": 0,
             "failed_queries": 0,
             "total_query_time_seconds": 0.0,
@@ -50,86 +145,120 @@ async def dns_bulk_query(
         }
 
     # Ensure max_workers is an integer (handles FastMCP type conversion issues)
-    max_workers = ensure_int(max_workers) or 10
+    # and within the configured safety limit
+    max_workers = config.validate_max_workers(
+        ensure_int(max_workers) or config.default_max_workers
+    )
     
+    # Query each distinct domain once; duplicates share its result
+    unique_domains = list(dict.fromkeys(domains))
+
     # Limit concurrent workers to prevent overwhelming resolvers
-    actual_workers = min(max_workers, len(domains))
+    actual_workers = min(max_workers, len(unique_domains))
 
     resolver = create_resolver(
         nameserver=nameserver, resolver_type=resolver_type, timeout=float(timeout)
     )
 
-    start_time = time.time()
+    # Context fields shared by every per-domain error
+    error_context = {"record_type": record_type, "resolver": resolver.resolver_id}
 
-    async def query_single_domain(domain: str) -> dict:
+    # Bind hot-path callables locally; closures read them faster than globals.
+    # Timings stay in integer nanoseconds until they are emitted
+    perf_counter_ns = time.perf_counter_ns
+    format_error = format_error_response
+    query = resolver.query
+
+    start_ns = perf_counter_ns()
+
+    async def query_single_domain(domain: str) -> DomainResult:
         """Query single domain with comprehensive error handling"""
-        domain_start = time.time()
+        domain_start = perf_counter_ns()
 
         try:
-            records = await resolver.query(domain, record_type.upper())
-            query_time = time.time() - domain_start
-
-            return {
-                "domain": domain,
-                "record_type": record_type.upper(),
-                "records": records,
-                "record_count": len(records),
-                "query_time_seconds": round(query_time, 3),
-            }
+            records = await query(domain, record_type_upper)
+            query_ns = perf_counter_ns() - domain_start
+
+            return DomainResult(
+                domain=domain,
+                record_type=record_type_upper,
+                query_time_seconds=round(query_ns / 1e9, 3),
+                records=records,
+            )
 
         except Exception as e:
-            query_time = time.time() - domain_start
-
-            return {
-                "domain": domain,
-                "record_type": record_type.upper(),
-                "query_time_seconds": round(query_time, 3),
-                "error": format_error_response(
-                    e,
-                    context={
-                        "domain": domain,
-                        "record_type": record_type,
-                        "resolver": resolver.resolver_id,
-                    },
+            query_ns = perf_counter_ns() - domain_start
+
+            return DomainResult(
+                domain=domain,
+                record_type=record_type_upper,
+                query_time_seconds=round(query_ns / 1e9, 3),
+                error=format_error(
+                    e, context={"domain": domain, **error_context}
                 ),
-            }
-
-    # Execute concurrent queries with semaphore for rate limiting
-    semaphore = asyncio.Semaphore(actual_workers)
-
-    async def rate_limited_query(domain: str):
-        """Execute query with semaphore rate limiting"""
-        async with semaphore:
-            return await query_single_domain(domain)
-
-    # Create and execute all tasks
-    tasks = [rate_limited_query(domain) for domain in domains]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Handle any task-level exceptions
-    processed_results = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            # Task-level failure
-            processed_results.append(
-                {
-                    "domain": domains[i],
-                    "record_type": record_type.upper(),
-                    "query_time_seconds": 0.0,
-                    "error": format_error_response(
-                        result,
-                        context={
-                            "domain": domains[i],
-                            "record_type": record_type,
-                            "operation": "bulk_query",
-                        },
-                    ),
-                }
             )
-        else:
-            processed_results.append(result)
 
-    total_time = time.time() - start_time
+    def task_failure(job: tuple, error: Exception) -> DomainResult:
+        """Build the result for a domain whose task failed outright"""
+        domain = job[0]
+        return DomainResult(
+            domain=domain,
+            record_type=record_type_upper,
+            query_time_seconds=0.0,
+            error=format_error(
+                error,
+                context={
+                    "domain": domain,
+                    "record_type": record_type,
+                    "operation": "bulk_query",
+                },
+            ),
+        )
+
+    # Execute concurrent queries, at most actual_workers in flight
+    results = await run_bounded(
+        query_single_domain,
+        [(domain,) for domain in unique_domains],
+        actual_workers,
+        on_error=task_failure,
+    )
+
+    result_by_domain = dict(zip(unique_domains, results, strict=True))
+
+    if columnar:
+        # One list per field, fanned out to every requested position; no
+        # per-domain dicts are built
+        column_results = [result_by_domain[domain] for domain in domains]
+        columns = {
+            "domains": domains,
+            "records": [result.records for result in column_results],
+            "query_time_seconds": [
+                result.query_time_seconds for result in column_results
+            ],
+            "errors": [result.error for result in column_results],
+        }
+        processed_results = []
+        # list.count runs in C; successes are the positions without an error
+        successful_queries = columns["errors"].count(None)
+    else:
+        # Convert each distinct result to its response dict exactly once
+        results_by_domain = {}
+        successes_by_domain = {}
+        for domain, result in result_by_domain.items():
+            results_by_domain[domain] = result.as_dict()
+            successes_by_domain[domain] = result.error is None
+
+        # Fan results back out to every requested position, duplicates
+        # included, counting successes on the way
+        columns = None
+        processed_results = []
+        successful_queries = 0
+        for domain in domains:
+            if successes_by_domain[domain]:
+                successful_queries += 1
+            processed_results.append(results_by_domain[domain])
+
+    total_time = (perf_counter_ns() - start_ns) / 1e9
 
     resolver_info = {
         "resolver_id": resolver.resolver_id,
@@ -139,10 +268,14 @@ async def dns_bulk_query(
 
     return format_bulk_response(
         domains=domains,
-        record_type=record_type,
+        record_type=record_type_upper,
         results=processed_results,
         total_time=total_time,
         resolver_info=resolver_info,
+        unique_count=len(unique_domains),
+        successful_queries=successful_queries,
+        failed_queries=len(domains) - successful_queries,
+        columns=columns,
     )
 
 
@@ -171,6 +304,7 @@ async def dns_bulk_reverse_lookup(
         return {
             "bulk_reverse_lookup": True,
             "ip_count": 0,
+            "unique_ip_count": 0,
             "successful_queries": 0,
             "failed_queries": 0,
             "total_query_time_seconds": 0.0,
@@ -179,109 +313,120 @@ async def dns_bulk_reverse_lookup(
         }
 
     # Ensure max_workers is an integer (handles FastMCP type conversion issues)
-    max_workers = ensure_int(max_workers) or 10
+    # and within the configured safety limit
+    max_workers = config.validate_max_workers(
+        ensure_int(max_workers) or config.default_max_workers
+    )
     
-    # Limit concurrent workers
-    actual_workers = min(max_workers, len(ips))
-
-    start_time = time.time()
-
-    async def reverse_lookup_single_ip(ip: str) -> dict:
-        """Reverse lookup single IP with error handling"""
-        try:
-            # Generate reverse DNS name
-            reverse_name = dns.reversename.from_address(ip)
-            reverse_domain = str(reverse_name)
-
-            resolver = create_resolver(
-                nameserver=nameserver,
-                resolver_type=resolver_type,
-                timeout=float(timeout),
-            )
+    # Look up each distinct IP once; duplicates share its result
+    unique_ips = list(dict.fromkeys(ips))
 
-            start_time = time.time()
-            error = None
-            hostnames = []
-
-            try:
-                hostnames = await resolver.query(reverse_domain, "PTR")
-            except Exception as e:
-                error = e
+    # Limit concurrent workers
+    actual_workers = min(max_workers, len(unique_ips))
 
-            query_time = time.time() - start_time
+    resolver = create_resolver(
+        nameserver=nameserver, resolver_type=resolver_type, timeout=float(timeout)
+    )
 
-            response = {
-                "ip": ip,
-                "reverse_domain": reverse_domain,
-                "nameserver": nameserver or resolver_type,
-                "query_time_seconds": round(query_time, 3),
-            }
+    # Bind hot-path callables locally; closures read them faster than globals.
+    # Timings stay in integer nanoseconds until they are emitted
+    perf_counter_ns = time.perf_counter_ns
+    format_error = format_error_response
+    query = resolver.query
 
-            if error:
-                response["error"] = format_error_response(
-                    error,
-                    context={
-                        "ip": ip,
-                        "reverse_domain": reverse_domain,
-                        "resolver": resolver.resolver_id,
-                    },
-                )
-            else:
-                response.update(
-                    {"hostnames": hostnames, "hostname_count": len(hostnames)}
-                )
-
-            return response
+    start_ns = perf_counter_ns()
 
+    # Build reverse DNS names once up front; invalid IPs keep their parse error
+    lookups = []
+    for ip in unique_ips:
+        try:
+            lookups.append((ip, reverse_domain_name(ip), None))
         except Exception as e:
-            # Handle invalid IP address or other errors
+            lookups.append((ip, None, e))
+
+    async def reverse_lookup_single_ip(
+        ip: str, reverse_domain: str | None, ip_error: Exception | None
+    ) -> dict:
+        """Reverse lookup single IP with error handling"""
+        if ip_error is not None:
+            # Invalid IP address - no query is issued
             return {
                 "ip": ip,
                 "nameserver": nameserver or resolver_type,
                 "query_time_seconds": 0.0,
-                "error": format_error_response(
-                    e, context={"ip": ip, "operation": "reverse_lookup"}
+                "error": format_error(
+                    ip_error, context={"ip": ip, "operation": "reverse_lookup"}
                 ),
             }
 
-    # Execute concurrent reverse lookups with semaphore
-    semaphore = asyncio.Semaphore(actual_workers)
+        query_start = perf_counter_ns()
+        error = None
+        hostnames = []
 
-    async def rate_limited_reverse_lookup(ip: str):
-        """Execute reverse lookup with semaphore rate limiting"""
-        async with semaphore:
-            return await reverse_lookup_single_ip(ip)
+        try:
+            hostnames = await query(reverse_domain, "PTR")
+        except Exception as e:
+            error = e
 
-    # Create and execute all tasks
-    tasks = [rate_limited_reverse_lookup(ip) for ip in ips]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+        query_ns = perf_counter_ns() - query_start
 
-    # Handle task-level exceptions
-    processed_results = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            processed_results.append(
-                {
-                    "ip": ips[i],
-                    "nameserver": nameserver or resolver_type,
-                    "query_time_seconds": 0.0,
-                    "error": format_error_response(
-                        result,
-                        context={"ip": ips[i], "operation": "bulk_reverse_lookup"},
-                    ),
-                }
+        response = {
+            "ip": ip,
+            "reverse_domain": reverse_domain,
+            "nameserver": nameserver or resolver_type,
+            "query_time_seconds": round(query_ns / 1e9, 3),
+        }
+
+        if error:
+            response["error"] = format_error(
+                error,
+                context={
+                    "ip": ip,
+                    "reverse_domain": reverse_domain,
+                    "resolver": resolver.resolver_id,
+                },
             )
         else:
-            processed_results.append(result)
+            response.update({"hostnames": hostnames, "hostname_count": len(hostnames)})
 
-    total_time = time.time() - start_time
-    successful_queries = sum(1 for r in processed_results if "error" not in r)
+        return response
+
+    def task_failure(job: tuple, error: Exception) -> dict:
+        """Build the result for an IP whose task failed outright"""
+        ip = job[0]
+        return {
+            "ip": ip,
+            "nameserver": nameserver or resolver_type,
+            "query_time_seconds": 0.0,
+            "error": format_error(
+                error, context={"ip": ip, "operation": "bulk_reverse_lookup"}
+            ),
+        }
+
+    # Execute concurrent reverse lookups, at most actual_workers in flight
+    results = await run_bounded(
+        reverse_lookup_single_ip, lookups, actual_workers, on_error=task_failure
+    )
+    results_by_ip = dict(zip(unique_ips, results, strict=True))
+
+    # Fan results back out to every requested position, duplicates included,
+    # counting successes on the way
+    processed_results = []
+    successful_queries = 0
+    for ip in ips:
+        result = results_by_ip[ip]
+        if "error" not in result:
+            successful_queries += 1
+        processed_results.append(result)
     failed_queries = len(processed_results) - successful_queries
 
+    total_time = (perf_counter_ns() - start_ns) / 1e9
+
     return {
         "bulk_reverse_lookup": True,
         "nameserver": nameserver or resolver_type,
         "ip_count": len(ips),
+        "unique_ip_count": len(unique_ips),
         "successful_queries": successful_queries,
         "failed_queries": failed_queries,
         "total_query_time_seconds": round(total_time, 3),
@@ -3,10 +3,11 @@ Configuration management for DNS OSINT MCP Server
 Centralized settings for rate limiting, timeouts, resolvers, and default values
 """
 
+import re
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DNSServerConfig:
     """
     Main configuration class for DNS OSINT MCP Server
@@ -24,9 +25,26 @@ class DNSServerConfig:
     # Concurrency Configuration
     default_max_workers: int = 10
     max_concurrent_workers: int = 50  # safety limit
-    dns_query_all_concurrency: int = (
-        3  # concurrent queries to same resolver in query_all
-    )
+    # concurrent queries to same resolver in query_all; aiodns multiplexes all
+    # record types over one c-ares channel, so every type can be in flight
+    dns_query_all_concurrency: int = 9
+
+    # Resolver Pool Configuration
+    resolver_pool_size: int = 128  # shared resolver instances kept per process
+    # aiodns channels per resolver; queries round-robin across them so a bulk
+    # run is not funnelled through a single c-ares channel and its sockets
+    resolver_channels: int = 4
+
+    # Answer Cache Configuration
+    dns_cache_size: int = 1024  # cached answers per resolver
+    dns_cache_ttl: float = 300.0  # seconds, used when answers carry no TTL
+    dns_cache_max_ttl: float = 3600.0  # upper bound on any cached answer's TTL
+    dns_cache_min_ttl: float = 60.0  # lower bound on any cached answer's TTL
+    # NXDOMAIN/NODATA answers; aiodns does not expose the SOA minimum, so a
+    # fixed negative TTL is used, bounded like the SOA minimum would be
+    dns_negative_cache_ttl: float = 60.0  # seconds
+    dns_negative_cache_min_ttl: float = 10.0
+    dns_negative_cache_max_ttl: float = 900.0
 
     # Bulk Query Configuration
     default_bulk_delay: float = 0.1  # delay between queries in response analysis
@@ -36,6 +54,8 @@ class DNSServerConfig:
     default_wildcard_test_count: int = 3
     max_wildcard_test_count: int = 10  # safety limit
     wildcard_subdomain_length: int = 32  # length of random subdomains
+    wildcard_check_concurrency: int = 10  # concurrent probes in wildcard check
+    response_analysis_concurrency: int = 4  # in-flight queries in response analysis
 
     # Response Analysis Configuration
     anomaly_threshold_multiplier: float = (
@@ -86,8 +106,12 @@ DEFAULT_PROPAGATION_RESOLVERS = {
     "verisign": "64.6.64.6",
 }
 
-# Supported DNS Record Types
-SUPPORTED_RECORD_TYPES = [
+# Every accepted resolver_type, so validation is a single set lookup
+_RESOLVER_TYPES = frozenset(RESOLVER_CONFIGS) | {"system"}
+
+# Supported DNS Record Types; a tuple so the order stays fixed for messages and
+# iteration, with membership checks going through the lookup tables below
+SUPPORTED_RECORD_TYPES = (
     "A",
     "AAAA",
     "MX",
@@ -98,10 +122,19 @@ SUPPORTED_RECORD_TYPES = [
     "CAA",
     "SRV",
     "PTR",
-]
+)
+
+# Uppercased name -> the canonical (interned literal) record type string, so
+# validation is one dict lookup and every caller shares the same string objects
+_CANONICAL_RECORD_TYPES = {
+    record_type: record_type for record_type in SUPPORTED_RECORD_TYPES
+}
+
+# Listing used in validation errors
+_SUPPORTED_RECORD_TYPES_TEXT = ", ".join(SUPPORTED_RECORD_TYPES)
 
 # CDN and Hosting Indicators for Wildcard Analysis
-CDN_INDICATORS = [
+CDN_INDICATORS = (
     "cloudflare",
     "amazonaws",
     "cloudfront",
@@ -111,7 +144,12 @@ CDN_INDICATORS = [
     "edgecast",
     "maxcdn",
     "keycdn",
-]
+)
+
+# Single-pass matcher over all CDN indicators
+_CDN_PATTERN = re.compile(
+    "|".join(re.escape(indicator) for indicator in CDN_INDICATORS)
+)
 
 # Global configuration instance
 config = DNSServerConfig()
@@ -130,13 +168,13 @@ def validate_record_type(record_type: str) -> str:
     Raises:
         ValueError: If record type is not supported
     """
-    record_type = record_type.upper()
-    if record_type not in SUPPORTED_RECORD_TYPES:
+    canonical = _CANONICAL_RECORD_TYPES.get(record_type.upper())
+    if canonical is None:
         raise ValueError(
-            f"Unsupported record type: {record_type}. "
-            f"Supported types: {', '.join(SUPPORTED_RECORD_TYPES)}"
+            f"Unsupported record type: {record_type.upper()}. "
+            f"Supported types: {_SUPPORTED_RECORD_TYPES_TEXT}"
         )
-    return record_type
+    return canonical
 
 
 def validate_resolver_type(resolver_type: str) -> str:
@@ -152,7 +190,7 @@ def validate_resolver_type(resolver_type: str) -> str:
     Raises:
         ValueError: If resolver type is not supported
     """
-    if resolver_type not in RESOLVER_CONFIGS and resolver_type != "system":
+    if resolver_type not in _RESOLVER_TYPES:
         raise ValueError(
             f"Unsupported resolver type: {resolver_type}. "
             f"Supported types: {', '.join([*RESOLVER_CONFIGS, 'system'])}"
@@ -197,8 +235,7 @@ def is_cdn_related(record: str) -> bool:
     if record is None:
         return False
 
-    record_lower = str(record).lower()
-    return any(indicator in record_lower for indicator in CDN_INDICATORS)
+    return _CDN_PATTERN.search(str(record).lower()) is not None
 
 
 # Configuration validation on import
@@ -207,6 +244,7 @@ def _validate_config():
     assert config.default_rate_limit > 0, "Rate limit must be positive"
     assert config.default_timeout > 0, "Timeout must be positive"
     assert config.default_max_workers > 0, "Max workers must be positive"
+    assert config.resolver_channels > 0, "Resolver channels must be positive"
     assert (
         0 < config.high_failure_rate_threshold < 1
     ), "Failure rate threshold must be between 0 and 1"
@@ -6,13 +6,14 @@ Basic DNS query and reverse lookup functionality with async support
 import asyncio
 import time
 
-import dns.reversename
-
-from .config import config
+from .config import config, validate_record_type
 from .formatters import format_dns_response, format_error_response
-from .resolvers import create_resolver
+from .resolvers import create_resolver, reverse_domain_name
 from .server import mcp
 
+# Record types profiled by dns_query_all
+QUERY_ALL_RECORD_TYPES = ("A", "AAAA", "MX", "TXT", "NS", "SOA", "CNAME", "CAA", "SRV")
+
 
 @mcp.tool()
 async def dns_query(
@@ -39,22 +40,35 @@ async def dns_query(
         nameserver=nameserver, resolver_type=resolver_type, timeout=float(timeout)
     )
 
-    start_time = time.time()
+    resolver_info = {
+        "resolver_id": resolver.resolver_id,
+        "resolver_type": resolver_type,
+        "nameserver": nameserver,
+    }
+
+    # Reject unsupported record types before touching the rate limiter
+    try:
+        record_type_upper = validate_record_type(record_type)
+    except ValueError as e:
+        return format_dns_response(
+            domain=domain,
+            record_type=record_type,
+            records=[],
+            query_time=0.0,
+            resolver_info=resolver_info,
+            error=e,
+        )
+
+    start_time = time.perf_counter()
     records = []
     error = None
 
     try:
-        records = await resolver.query(domain, record_type.upper())
+        records = await resolver.query(domain, record_type_upper)
     except Exception as e:
         error = e
 
-    query_time = time.time() - start_time
-
-    resolver_info = {
-        "resolver_id": resolver.resolver_id,
-        "resolver_type": resolver_type,
-        "nameserver": nameserver,
-    }
+    query_time = time.perf_counter() - start_time
 
     return format_dns_response(
         domain=domain,
@@ -87,14 +101,13 @@ async def dns_reverse_lookup(
     """
     try:
         # Generate reverse DNS name
-        reverse_name = dns.reversename.from_address(ip)
-        reverse_domain = str(reverse_name)
+        reverse_domain = reverse_domain_name(ip)
 
         resolver = create_resolver(
             nameserver=nameserver, resolver_type=resolver_type, timeout=float(timeout)
         )
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         hostnames = []
         error = None
 
@@ -103,7 +116,7 @@ async def dns_reverse_lookup(
         except Exception as e:
             error = e
 
-        query_time = time.time() - start_time
+        query_time = time.perf_counter() - start_time
 
         response = {
             "ip": ip,
@@ -156,14 +169,11 @@ async def dns_query_all(
     Returns:
         Dictionary with comprehensive DNS profile
     """
-    # Record types to query concurrently
-    record_types = ["A", "AAAA", "MX", "TXT", "NS", "SOA", "CNAME", "CAA", "SRV"]
-
     resolver = create_resolver(
         nameserver=nameserver, resolver_type=resolver_type, timeout=float(timeout)
     )
 
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # Execute all queries concurrently with limited concurrency to avoid overwhelming resolver
     semaphore = asyncio.Semaphore(
@@ -180,23 +190,19 @@ async def dns_query_all(
             except Exception as e:
                 return record_type, [], e
 
-    # Execute queries with controlled concurrency
-    tasks = [query_record_type(rt) for rt in record_types]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Execute queries with controlled concurrency; query_record_type returns
+    # every query error as a value, so gather itself has nothing to swallow
+    results = await asyncio.gather(
+        *(query_record_type(rt) for rt in QUERY_ALL_RECORD_TYPES)
+    )
 
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
 
     # Process results
     records = {}
     errors = {}
 
-    for result in results:
-        if isinstance(result, Exception):
-            # Task itself failed (shouldn't happen with our error handling)
-            continue
-
-        record_type, record_list, error = result
-
+    for record_type, record_list, error in results:
         if error:
             errors[record_type] = format_error_response(
                 error,
@@ -217,7 +223,7 @@ async def dns_query_all(
         "total_query_time_seconds": round(total_time, 3),
         "records": records,
         "record_types_found": len(records),
-        "total_records": sum(len(record_list) for record_list in records.values()),
+        "total_records": sum(map(len, records.values())),
     }
 
     if errors:
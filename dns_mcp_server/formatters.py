@@ -3,9 +3,132 @@ DNS record formatting utilities
 Handles formatting of various DNS record types and error responses
 """
 
-from datetime import datetime
+import re
+from datetime import datetime, timezone
 from typing import Any
 
+from aiodns import error as aiodns_error
+
+# OSINT error classifications, keyed by the patterns that identify them
+# These are merged into every classified error response with dict.update, so the
+# nested insight dicts and tuples are shared between responses: treat as read-only
+_NXDOMAIN_RESPONSE = {
+    "error": "domain_not_found",
+    "type": "NXDOMAIN",
+    "osint_insights": {
+        "possible_scenarios": (
+            "Domain never existed (typosquatting target)",
+            "Domain expired (abandoned infrastructure)",
+            "Domain suspended (possible takedown)",
+            "DNS configuration error",
+        ),
+        "investigation_tips": (
+            "Check historical DNS records",
+            "Search for similar domain variations",
+            "Verify domain registration status",
+        ),
+    },
+}
+
+_NO_ANSWER_RESPONSE = {
+    "error": "no_records",
+    "type": "NoAnswer",
+    "osint_insights": {
+        "possible_scenarios": (
+            "Record type not configured",
+            "Selective DNS response (geo-blocking)",
+            "DNS filtering/sinkholing",
+        ),
+        "investigation_tips": (
+            "Try different record types",
+            "Query from different resolver locations",
+            "Check if domain is parked",
+        ),
+    },
+}
+
+_TIMEOUT_RESPONSE = {
+    "error": "timeout",
+    "type": "Timeout",
+    "osint_insights": {
+        "possible_scenarios": (
+            "Slow/overloaded nameserver",
+            "Network filtering",
+            "DDoS protection triggering",
+        ),
+        "investigation_tips": (
+            "Retry with longer timeout",
+            "Try alternative resolver",
+            "Check nameserver health",
+        ),
+    },
+}
+
+_SERVFAIL_RESPONSE = {
+    "error": "server_failure",
+    "type": "SERVFAIL",
+    "osint_insights": {
+        "possible_scenarios": (
+            "Authoritative server error",
+            "DNSSEC validation failure",
+            "Nameserver misconfiguration",
+        ),
+        "investigation_tips": (
+            "Try different resolver",
+            "Check DNSSEC status",
+            "Verify nameserver configuration",
+        ),
+    },
+}
+
+_REFUSED_RESPONSE = {
+    "error": "query_refused",
+    "type": "REFUSED",
+    "osint_insights": {
+        "possible_scenarios": (
+            "Recursive queries disabled",
+            "Access control restrictions",
+            "Rate limiting active",
+        ),
+        "investigation_tips": (
+            "Try authoritative nameserver",
+            "Use different source IP",
+            "Reduce query rate",
+        ),
+    },
+}
+
+# aiodns raises DNSError(code, message) with c-ares error codes whose messages
+# ("Domain name not found", ...) don't match the patterns below, so these codes
+# are classified directly
+_ARES_ERROR_RESPONSES = {
+    aiodns_error.ARES_ENOTFOUND: _NXDOMAIN_RESPONSE,
+    aiodns_error.ARES_ENODATA: _NO_ANSWER_RESPONSE,
+    aiodns_error.ARES_ETIMEOUT: _TIMEOUT_RESPONSE,
+    aiodns_error.ARES_ESERVFAIL: _SERVFAIL_RESPONSE,
+    aiodns_error.ARES_EREFUSED: _REFUSED_RESPONSE,
+}
+
+# Checked in order; first match wins
+# Entries are (message pattern, exception type pattern or None, response payload)
+_ERROR_CLASSIFIERS = (
+    (re.compile("NXDOMAIN|No such domain"), None, _NXDOMAIN_RESPONSE),
+    (re.compile("No answer|NODATA"), None, _NO_ANSWER_RESPONSE),
+    (re.compile("timeout", re.IGNORECASE), re.compile("Timeout"), _TIMEOUT_RESPONSE),
+    (re.compile("SERVFAIL"), None, _SERVFAIL_RESPONSE),
+    (re.compile("REFUSED"), None, _REFUSED_RESPONSE),
+)
+
+
+def _classify_error(error_msg: str, error_type: str) -> dict[str, Any] | None:
+    """Return the OSINT classification payload for an error, if any"""
+    for message_pattern, type_pattern, payload in _ERROR_CLASSIFIERS:
+        if message_pattern.search(error_msg) or (
+            type_pattern is not None and type_pattern.search(error_type)
+        ):
+            return payload
+    return None
+
 
 def format_error_response(
     error: Exception, context: dict[str, Any] | None = None
@@ -23,115 +146,27 @@ def format_error_response(
     error_type = type(error).__name__
     error_msg = str(error)
 
+    # OSINT-aware error classification
+    classification = None
+    if isinstance(error, aiodns_error.DNSError) and error.args:
+        classification = _ARES_ERROR_RESPONSES.get(error.args[0])
+    if classification is None:
+        classification = _classify_error(error_msg, error_type)
+
     # Base error response
     response = {
         "error": "unknown",
         "type": error_type,
         "details": error_msg,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
     }
 
     # Add context if provided
     if context:
         response.update(context)
 
-    # OSINT-aware error classification
-    if "NXDOMAIN" in error_msg or "No such domain" in error_msg:
-        response.update(
-            {
-                "error": "domain_not_found",
-                "type": "NXDOMAIN",
-                "osint_insights": {
-                    "possible_scenarios": [
-                        "Domain never existed (typosquatting target)",
-                        "Domain expired (abandoned infrastructure)",
-                        "Domain suspended (possible takedown)",
-                        "DNS configuration error",
-                    ],
-                    "investigation_tips": [
-                        "Check historical DNS records",
-                        "Search for similar domain variations",
-                        "Verify domain registration status",
-                    ],
-                },
-            }
-        )
-    elif "No answer" in error_msg or "NODATA" in error_msg:
-        response.update(
-            {
-                "error": "no_records",
-                "type": "NoAnswer",
-                "osint_insights": {
-                    "possible_scenarios": [
-                        "Record type not configured",
-                        "Selective DNS response (geo-blocking)",
-                        "DNS filtering/sinkholing",
-                    ],
-                    "investigation_tips": [
-                        "Try different record types",
-                        "Query from different resolver locations",
-                        "Check if domain is parked",
-                    ],
-                },
-            }
-        )
-    elif "timeout" in error_msg.lower() or "Timeout" in error_type:
-        response.update(
-            {
-                "error": "timeout",
-                "type": "Timeout",
-                "osint_insights": {
-                    "possible_scenarios": [
-                        "Slow/overloaded nameserver",
-                        "Network filtering",
-                        "DDoS protection triggering",
-                    ],
-                    "investigation_tips": [
-                        "Retry with longer timeout",
-                        "Try alternative resolver",
-                        "Check nameserver health",
-                    ],
-                },
-            }
-        )
-    elif "SERVFAIL" in error_msg:
-        response.update(
-            {
-                "error": "server_failure",
-                "type": "SERVFAIL",
-                "osint_insights": {
-                    "possible_scenarios": [
-                        "Authoritative server error",
-                        "DNSSEC validation failure",
-                        "Nameserver misconfiguration",
-                    ],
-                    "investigation_tips": [
-                        "Try different resolver",
-                        "Check DNSSEC status",
-                        "Verify nameserver configuration",
-                    ],
-                },
-            }
-        )
-    elif "REFUSED" in error_msg:
-        response.update(
-            {
-                "error": "query_refused",
-                "type": "REFUSED",
-                "osint_insights": {
-                    "possible_scenarios": [
-                        "Recursive queries disabled",
-                        "Access control restrictions",
-                        "Rate limiting active",
-                    ],
-                    "investigation_tips": [
-                        "Try authoritative nameserver",
-                        "Use different source IP",
-                        "Reduce query rate",
-                    ],
-                },
-            }
-        )
+    if classification is not None:
+        response.update(classification)
 
     return response
 
@@ -158,27 +193,32 @@ def format_dns_response(
     Returns:
         Formatted response dictionary
     """
-    response = {
+    # Each outcome is a single literal so every response of a kind has the same shape
+    if error:
+        return {
+            "domain": domain,
+            "record_type": record_type.upper(),
+            "nameserver": resolver_info.get("resolver_id", "unknown"),
+            "query_time_seconds": round(query_time, 3),
+            "error": format_error_response(
+                error,
+                context={
+                    "domain": domain,
+                    "record_type": record_type,
+                    "resolver": resolver_info.get("resolver_id"),
+                },
+            ),
+        }
+
+    return {
         "domain": domain,
         "record_type": record_type.upper(),
         "nameserver": resolver_info.get("resolver_id", "unknown"),
         "query_time_seconds": round(query_time, 3),
+        "records": records,
+        "record_count": len(records),
     }
 
-    if error:
-        response["error"] = format_error_response(
-            error,
-            context={
-                "domain": domain,
-                "record_type": record_type,
-                "resolver": resolver_info.get("resolver_id"),
-            },
-        )
-    else:
-        response.update({"records": records, "record_count": len(records)})
-
-    return response
-
 
 def format_bulk_response(
     domains: list,
@@ -186,6 +226,10 @@ def format_bulk_response(
     results: list,
     total_time: float,
     resolver_info: dict[str, Any],
+    unique_count: int | None = None,
+    successful_queries: int | None = None,
+    failed_queries: int | None = None,
+    columns: dict[str, list] | None = None,
 ) -> dict[str, Any]:
     """
     Format bulk DNS query response
@@ -196,23 +240,37 @@ def format_bulk_response(
         results: List of individual query results
         total_time: Total execution time
         resolver_info: Resolver configuration details
+        unique_count: Number of distinct domains actually queried (defaults to
+            the number of domains)
+        successful_queries: Precomputed success count (counted from results if
+            omitted)
+        failed_queries: Precomputed failure count (counted from results if
+            omitted)
+        columns: Columnar results; returned under "columns" in place of
+            "results" when given
 
     Returns:
         Formatted bulk response dictionary
     """
-    successful_queries = sum(1 for r in results if "error" not in r)
-    failed_queries = len(results) - successful_queries
+    if successful_queries is None or failed_queries is None:
+        successful_queries = sum(1 for r in results if "error" not in r)
+        failed_queries = len(results) - successful_queries
 
-    return {
+    response = {
         "bulk_query": True,
         "record_type": record_type.upper(),
         "nameserver": resolver_info.get("resolver_id", "unknown"),
         "domain_count": len(domains),
+        "unique_domain_count": len(domains) if unique_count is None else unique_count,
         "successful_queries": successful_queries,
         "failed_queries": failed_queries,
         "total_query_time_seconds": round(total_time, 3),
         "average_query_time_seconds": round(total_time / len(domains), 3)
         if domains
         else 0,
-        "results": results,
     }
+    if columns is not None:
+        response["columns"] = columns
+    else:
+        response["results"] = results
+    return response
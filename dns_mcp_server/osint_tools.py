@@ -71,11 +71,12 @@ Note:
 """
 
 import asyncio
+import math
 import secrets
 import statistics
-import string
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
+from dataclasses import dataclass
 
 from .config import (
     DEFAULT_PROPAGATION_RESOLVERS,
@@ -89,12 +90,63 @@ from .resolvers import create_resolver
 from .server import mcp
 
 
+@dataclass(slots=True)
+class _RunningStats:
+    """
+    Online min, max, mean and variance using Welford's update
+
+    Values are folded in one at a time, so statistics are available as soon
+    as the last sample lands with no further pass over the data.
+    """
+
+    count: int = 0
+    min_time: float = math.inf
+    max_time: float = -math.inf
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, t: float):
+        """Fold one sample into the running statistics"""
+        self.count += 1
+        if t < self.min_time:
+            self.min_time = t
+        if t > self.max_time:
+            self.max_time = t
+        delta = t - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (t - self.mean)
+
+    @property
+    def std_dev(self) -> float | None:
+        """Sample standard deviation, or None with fewer than two samples"""
+        if self.count < 2:
+            return None
+        return (self.m2 / (self.count - 1)) ** 0.5
+
+
+def _time_stats(times: list[float]) -> tuple[float, float, float, float | None]:
+    """
+    Compute min, max, mean and sample standard deviation in a single pass
+
+    Args:
+        times: Non-empty list of response times
+
+    Returns:
+        Tuple of (min, max, mean, std_dev); std_dev is None for a single value
+    """
+    stats = _RunningStats()
+    for t in times:
+        stats.add(t)
+    return stats.min_time, stats.max_time, stats.mean, stats.std_dev
+
+
 @mcp.tool()
 async def dns_propagation_check(
     domain: str,
     record_type: str = "A",
     resolvers: dict[str, str] | None = None,
     timeout: int = 10,
+    early_exit: bool = False,
 ) -> dict:
     """
     Check DNS propagation across multiple resolvers to detect inconsistencies
@@ -110,6 +162,8 @@ async def dns_propagation_check(
         record_type: DNS record type to check (A, AAAA, MX, TXT, etc.)
         resolvers: Custom resolver dict (name: IP), uses defaults if None
         timeout: Query timeout in seconds
+        early_exit: Return as soon as two resolvers disagree, cancelling the
+            queries still in flight (the result is then marked partial)
 
     Returns:
         Dictionary with propagation analysis and OSINT insights
@@ -117,19 +171,24 @@ async def dns_propagation_check(
     if resolvers is None:
         resolvers = DEFAULT_PROPAGATION_RESOLVERS.copy()
 
-    start_time = time.time()
-    results = {}
+    record_type_upper = record_type.upper()
+    start_time = time.perf_counter()
 
     async def query_resolver(resolver_name: str, resolver_ip: str) -> tuple[str, dict]:
         """Query a single resolver and return results"""
+        query_start = time.perf_counter()
         try:
+            # Uncached: the check exists to see each resolver's current answer
             resolver = create_resolver(
-                nameserver=resolver_ip, resolver_type="custom", timeout=float(timeout)
+                nameserver=resolver_ip,
+                resolver_type="custom",
+                timeout=float(timeout),
+                use_cache=False,
             )
 
-            query_start = time.time()
-            records = await resolver.query(domain, record_type.upper())
-            query_time = time.time() - query_start
+            # Sorted once here so grouping can compare responses directly
+            records = sorted(await resolver.query(domain, record_type_upper))
+            query_time = time.perf_counter() - query_start
 
             return resolver_name, {
                 "success": True,
@@ -140,7 +199,7 @@ async def dns_propagation_check(
             }
 
         except Exception as e:
-            query_time = time.time() - query_start if "query_start" in locals() else 0
+            query_time = time.perf_counter() - query_start
 
             return resolver_name, {
                 "success": False,
@@ -157,19 +216,38 @@ async def dns_propagation_check(
                 "resolver_ip": resolver_ip,
             }
 
-    # Execute all queries concurrently
-    tasks = [query_resolver(name, ip) for name, ip in resolvers.items()]
-
-    query_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Process results
-    for result in query_results:
-        if isinstance(result, Exception):
-            continue  # Skip failed tasks
-        resolver_name, resolver_result = result
-        results[resolver_name] = resolver_result
-
-    total_time = time.time() - start_time
+    # Execute all queries concurrently. query_resolver turns every query error
+    # into a result, so anything raised here (including cancellation) is
+    # allowed to propagate rather than being swallowed as a return value
+    tasks = [
+        asyncio.ensure_future(query_resolver(name, ip))
+        for name, ip in resolvers.items()
+    ]
+    results = {}
+    seen_responses: set[frozenset] = set()
+    partial = False
+
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            resolver_name, resolver_result = await next_result
+            results[resolver_name] = resolver_result
+
+            # Two distinct answers already settle the consistency verdict
+            if early_exit and resolver_result["success"]:
+                seen_responses.add(frozenset(resolver_result["records"]))
+                if len(seen_responses) > 1:
+                    partial = len(results) < len(tasks)
+                    break
+    finally:
+        # Cancel queries still pending after an early verdict
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Report resolvers in the order they were requested
+    results = {name: results[name] for name in resolvers if name in results}
+
+    total_time = time.perf_counter() - start_time
 
     # Analyze consistency
     successful_results = {
@@ -183,18 +261,13 @@ async def dns_propagation_check(
     }
 
     # Group resolvers by their record responses
-    response_groups = defaultdict(list)
-    unique_responses = []
+    # Keys are the distinct responses, so no separate uniqueness tracking is needed
+    response_groups: defaultdict[frozenset, list[str]] = defaultdict(list)
 
     for resolver_name, result in successful_results.items():
         if "records" in result:
-            # Create a hashable representation of the records
-            record_tuple = tuple(sorted(result["records"]))
-            response_groups[record_tuple].append(resolver_name)
-
-            # Track unique responses
-            if record_tuple not in [tuple(sorted(r)) for r in unique_responses]:
-                unique_responses.append(result["records"])
+            # Record sets are order-insensitive, so group on the set itself
+            response_groups[frozenset(result["records"])].append(resolver_name)
 
     is_consistent = len(response_groups) <= 1
 
@@ -205,15 +278,16 @@ async def dns_propagation_check(
 
     time_stats = {}
     if response_times:
+        min_time, max_time, mean, std_dev = _time_stats(response_times)
         time_stats = {
-            "min_time": round(min(response_times), 3),
-            "max_time": round(max(response_times), 3),
-            "avg_time": round(statistics.mean(response_times), 3),
+            "min_time": round(min_time, 3),
+            "max_time": round(max_time, 3),
+            "avg_time": round(mean, 3),
             "median_time": round(statistics.median(response_times), 3),
         }
 
-        if len(response_times) > 1:
-            time_stats["std_dev"] = round(statistics.stdev(response_times), 3)
+        if std_dev is not None:
+            time_stats["std_dev"] = round(std_dev, 3)
 
     # OSINT Analysis
     osint_analysis = {
@@ -247,22 +321,23 @@ async def dns_propagation_check(
 
     # Format response groups for output
     formatted_groups = []
-    for record_tuple, resolver_list in response_groups.items():
+    for record_set, resolver_list in response_groups.items():
         formatted_groups.append(
             {
                 "resolvers": resolver_list,
-                "records": list(record_tuple),
+                "records": sorted(record_set),
                 "resolver_count": len(resolver_list),
             }
         )
 
     return {
         "domain": domain,
-        "record_type": record_type.upper(),
+        "record_type": record_type_upper,
         "total_resolvers_queried": len(resolvers),
         "successful_queries": len(successful_results),
         "failed_queries": len(failed_results),
         "is_consistent": is_consistent,
+        "partial": partial,
         "unique_response_count": len(response_groups),
         "total_query_time_seconds": round(total_time, 3),
         "response_time_stats": time_stats,
@@ -308,96 +383,121 @@ async def dns_wildcard_check(
         nameserver=nameserver, resolver_type=resolver_type, timeout=float(timeout)
     )
 
-    start_time = time.time()
-
-    # Generate random subdomains (very unlikely to exist legitimately)
-    test_subdomains = []
-    for _ in range(test_count):
-        random_subdomain = "".join(
-            secrets.choice(string.ascii_lowercase + string.digits)
-            for _ in range(config.wildcard_subdomain_length)
-        )
-        test_subdomains.append(f"{random_subdomain}.{domain}")
+    start_time = time.perf_counter()
+
+    # Generate random subdomains (very unlikely to exist legitimately); a single
+    # urandom read covers every label, each sliced from the hex pool and
+    # trimmed to the configured length
+    label_length = config.wildcard_subdomain_length
+    stride = (label_length + 1) // 2 * 2
+    label_pool = secrets.token_hex(stride // 2 * test_count)
+    test_subdomains = [
+        f"{label_pool[offset:offset + label_length]}.{domain}"
+        for offset in range(0, stride * test_count, stride)
+    ]
 
     # Test both A and CNAME records for each subdomain
     test_results = []
 
-    async def test_subdomain(test_domain: str, record_type: str) -> dict:
-        """Test a single subdomain for a specific record type"""
-        try:
-            query_start = time.time()
-            records = await resolver.query(test_domain, record_type)
-            query_time = time.time() - query_start
-
-            return {
-                "test_domain": test_domain,
-                "record_type": record_type,
-                "has_wildcard": True,
-                "records": records,
-                "record_count": len(records),
-                "query_time_seconds": round(query_time, 3),
-            }
+    # Bound in-flight probes so large test counts don't flood the resolver
+    semaphore = asyncio.Semaphore(config.wildcard_check_concurrency)
+
+    async def test_subdomain(
+        test_domain: str, record_type: str
+    ) -> tuple[dict, Exception | None]:
+        """
+        Test a single subdomain for a specific record type
+
+        Failures are returned unformatted; the consumer formats only the
+        results it keeps, so probes finishing after an early verdict cost
+        nothing extra.
+        """
+        async with semaphore:
+            query_start = time.perf_counter()
+            try:
+                records = await resolver.query(test_domain, record_type)
+                query_time = time.perf_counter() - query_start
+
+                return {
+                    "test_domain": test_domain,
+                    "record_type": record_type,
+                    "has_wildcard": True,
+                    "records": records,
+                    "record_count": len(records),
+                    "query_time_seconds": round(query_time, 3),
+                }, None
+
+            except Exception as e:
+                query_time = time.perf_counter() - query_start
+
+                return {
+                    "test_domain": test_domain,
+                    "record_type": record_type,
+                    "has_wildcard": False,
+                    "query_time_seconds": round(query_time, 3),
+                }, e
 
-        except Exception as e:
-            query_time = time.time() - query_start if "query_start" in locals() else 0
+    # Create tasks for concurrent testing
+    tasks = [
+        asyncio.ensure_future(test_subdomain(test_domain, record_type))
+        for test_domain in test_subdomains
+        for record_type in ["A", "CNAME"]
+    ]
 
-            return {
-                "test_domain": test_domain,
-                "record_type": record_type,
-                "has_wildcard": False,
-                "query_time_seconds": round(query_time, 3),
-                "error": format_error_response(
-                    e,
+    # Process results as they complete
+    wildcard_detected = {"A": False, "CNAME": False}
+    wildcard_records: dict[str, Counter] = {"A": Counter(), "CNAME": Counter()}
+
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result, error = await next_result
+            record_type = result["record_type"]
+
+            if error is not None:
+                result["error"] = format_error_response(
+                    error,
                     context={
-                        "domain": test_domain,
+                        "domain": result["test_domain"],
                         "record_type": record_type,
                         "operation": "wildcard_test",
                     },
-                ),
-            }
-
-    # Create tasks for concurrent testing
-    tasks = []
-    for test_domain in test_subdomains:
-        for record_type in ["A", "CNAME"]:
-            tasks.append(test_subdomain(test_domain, record_type))
-
-    # Execute all tests concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Process results
-    wildcard_detected = {"A": False, "CNAME": False}
-    wildcard_records = {"A": set(), "CNAME": set()}
-
-    for result in results:
-        if isinstance(result, Exception):
-            continue
+                )
+            test_results.append(result)
 
-        test_results.append(result)
+            if result["has_wildcard"]:
+                wildcard_detected[record_type] = True
 
-        if result.get("has_wildcard", False):
-            record_type = result["record_type"]
-            wildcard_detected[record_type] = True
+                # Count wildcard records seen so far for pattern analysis
+                wildcard_records[record_type].update(result["records"])
 
-            # Collect all wildcard records for pattern analysis
-            for record in result.get("records", []):
-                wildcard_records[record_type].add(record)
+            # Verdict reached once both record types show a wildcard
+            if all(wildcard_detected.values()):
+                break
+    finally:
+        # Cancel probes still pending after an early verdict
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     has_any_wildcard = any(wildcard_detected.values())
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
 
     # Analyze wildcard patterns
     wildcard_analysis = {}
+    has_multiple_targets = False
     for record_type, detected in wildcard_detected.items():
         if detected:
-            records_list = list(wildcard_records[record_type])
+            record_counts = wildcard_records[record_type]
+            multiple_targets = len(record_counts) > 1
+            has_multiple_targets = has_multiple_targets or multiple_targets
             wildcard_analysis[record_type] = {
                 "detected": True,
-                "unique_records": records_list,
-                "record_count": len(records_list),
+                "unique_records": list(record_counts),
+                "record_count": len(record_counts),
+                "record_frequency": dict(record_counts),
                 "pattern_analysis": {
-                    "single_target": len(records_list) == 1,
-                    "multiple_targets": len(records_list) > 1,
+                    "single_target": len(record_counts) == 1,
+                    "multiple_targets": multiple_targets,
                 },
             }
         else:
@@ -418,18 +518,18 @@ async def dns_wildcard_check(
         )
 
         # Higher risk if multiple different targets
-        if any(len(wildcard_records[rt]) > 1 for rt in wildcard_records):
+        if has_multiple_targets:
             risk_level = "HIGH"
             security_implications.append(
                 "Multiple wildcard targets - unusual configuration"
             )
 
         # Check for common CDN/hosting patterns
-        all_records = set()
-        for record_set in wildcard_records.values():
-            all_records.update(record_set)
-
-        has_cdn_pattern = any(is_cdn_related(record) for record in all_records)
+        has_cdn_pattern = any(
+            is_cdn_related(record)
+            for record_counts in wildcard_records.values()
+            for record in record_counts
+        )
 
         if has_cdn_pattern:
             security_implications.append(
@@ -445,6 +545,7 @@ async def dns_wildcard_check(
         "domain": domain,
         "test_subdomains": test_subdomains,
         "test_count": test_count,
+        "tests_completed": len(test_results),
         "has_wildcard": has_any_wildcard,
         "wildcard_analysis": wildcard_analysis,
         "total_query_time_seconds": round(total_time, 3),
@@ -475,6 +576,7 @@ async def dns_response_analysis(
     nameserver: str | None = None,
     resolver_type: str = "system",
     timeout: int = 10,
+    use_cache: bool = False,
 ) -> dict:
     """
     Analyze DNS response times for anomaly detection
@@ -492,6 +594,8 @@ async def dns_response_analysis(
         nameserver: Custom nameserver IP (optional)
         resolver_type: Predefined resolver type
         timeout: Query timeout in seconds
+        use_cache: Allow cached answers (off by default so every iteration
+            measures a real network round-trip)
 
     Returns:
         Dictionary with response time analysis and anomaly detection
@@ -499,63 +603,81 @@ async def dns_response_analysis(
     # Validate and convert iterations parameter (handles FastMCP type issues)
     iterations = validate_optional_int(iterations, config.default_propagation_iterations)
     resolver = create_resolver(
-        nameserver=nameserver, resolver_type=resolver_type, timeout=float(timeout)
+        nameserver=nameserver,
+        resolver_type=resolver_type,
+        timeout=float(timeout),
+        use_cache=use_cache,
     )
 
-    start_time = time.time()
-    response_times = []
-    errors = []
-    successful_queries = 0
+    record_type_upper = record_type.upper()
+    start_time = time.perf_counter()
+    semaphore = asyncio.Semaphore(config.response_analysis_concurrency)
+    # Folded in as each query lands; the raw times are kept only for the
+    # median and the outlier list
+    stats = _RunningStats()
+
+    async def timed_query(i: int) -> tuple[float, dict | None]:
+        """Run one iteration, timing it independently of the other in-flight queries"""
+        async with semaphore:
+            iteration_start = time.perf_counter()
+            try:
+                _ = await resolver.query(domain, record_type_upper)
+                response_time = time.perf_counter() - iteration_start
+                stats.add(response_time)
+                outcome = (response_time, None)
+            except Exception as e:
+                response_time = time.perf_counter() - iteration_start
+                outcome = (
+                    response_time,
+                    {
+                        "iteration": i + 1,
+                        "query_time_seconds": round(response_time, 3),
+                        "error": format_error_response(
+                            e,
+                            context={
+                                "domain": domain,
+                                "record_type": record_type,
+                                "iteration": i + 1,
+                                "resolver": resolver.resolver_id,
+                            },
+                        ),
+                    },
+                )
 
-    for i in range(iterations):
-        iteration_start = time.time()
+            # Small delay to avoid overwhelming the resolver; held inside the
+            # semaphore so each slot still paces its own queries
+            if i < iterations - 1:  # Don't delay after the last iteration
+                await asyncio.sleep(config.default_bulk_delay)
 
-        try:
-            _ = await resolver.query(domain, record_type.upper())
-            response_time = time.time() - iteration_start
-            response_times.append(response_time)
-            successful_queries += 1
+            return outcome
 
-        except Exception as e:
-            response_time = time.time() - iteration_start
-            errors.append(
-                {
-                    "iteration": i + 1,
-                    "query_time_seconds": round(response_time, 3),
-                    "error": format_error_response(
-                        e,
-                        context={
-                            "domain": domain,
-                            "record_type": record_type,
-                            "iteration": i + 1,
-                            "resolver": resolver.resolver_id,
-                        },
-                    ),
-                }
-            )
+    outcomes = await asyncio.gather(*(timed_query(i) for i in range(iterations)))
 
-        # Small delay to avoid overwhelming the resolver
-        if i < iterations - 1:  # Don't delay after the last iteration
-            await asyncio.sleep(config.default_bulk_delay)
+    response_times = [
+        response_time for response_time, error in outcomes if error is None
+    ]
+    errors = [error for _, error in outcomes if error is not None]
+    successful_queries = len(response_times)
 
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
 
-    # Calculate response time statistics
+    # Calculate response time statistics; mean and stdev are computed once and
+    # shared between the summary and the anomaly threshold
     analysis = {}
     if response_times:
+        mean = stats.mean
+        std_dev = stats.std_dev
         analysis = {
-            "min_time": round(min(response_times), 4),
-            "max_time": round(max(response_times), 4),
-            "avg_time": round(statistics.mean(response_times), 4),
+            "min_time": round(stats.min_time, 4),
+            "max_time": round(stats.max_time, 4),
+            "avg_time": round(mean, 4),
             "median_time": round(statistics.median(response_times), 4),
         }
 
-        if len(response_times) > 1:
-            analysis["std_dev"] = round(statistics.stdev(response_times), 4)
+        if std_dev is not None:
+            analysis["std_dev"] = round(std_dev, 4)
 
             # Detect anomalies (times > threshold from config)
-            mean = statistics.mean(response_times)
-            std_dev = statistics.stdev(response_times)
             threshold = mean + (config.anomaly_threshold_multiplier * std_dev)
 
             anomalous_times = [round(t, 4) for t in response_times if t > threshold]
@@ -565,9 +687,8 @@ async def dns_response_analysis(
             analysis["anomaly_threshold"] = round(threshold, 4)
 
     # Performance and anomaly assessment
-    performance_rating = (
-        get_performance_rating(analysis.get("avg_time", 0)) if analysis else "UNKNOWN"
-    )
+    avg_time = analysis.get("avg_time", 0)
+    performance_rating = get_performance_rating(avg_time) if analysis else "UNKNOWN"
 
     # Calculate failure rate
     failure_rate = len(errors) / iterations if iterations > 0 else 0
@@ -577,15 +698,16 @@ async def dns_response_analysis(
     if failure_rate > config.high_failure_rate_threshold:
         potential_issues.append("High failure rate - possible blocking or filtering")
 
-    if analysis.get("avg_time", 0) > config.performance_thresholds["poor"]:
+    if avg_time > config.performance_thresholds["poor"]:
         potential_issues.append("Very slow responses - infrastructure issues")
 
     if analysis.get("std_dev", 0) > config.high_variance_threshold:
         potential_issues.append("High response time variance - unstable performance")
 
-    if analysis.get("anomaly_count", 0) > 0:
+    anomaly_count = analysis.get("anomaly_count", 0)
+    if anomaly_count > 0:
         potential_issues.append(
-            f"Response time anomalies detected ({analysis['anomaly_count']} outliers)"
+            f"Response time anomalies detected ({anomaly_count} outliers)"
         )
 
     if len(errors) > 0 and failure_rate < 1.0:
@@ -596,7 +718,7 @@ async def dns_response_analysis(
 
     return {
         "domain": domain,
-        "record_type": record_type.upper(),
+        "record_type": record_type_upper,
         "iterations": iterations,
         "successful_queries": successful_queries,
         "failed_queries": len(errors),
@@ -611,9 +733,7 @@ async def dns_response_analysis(
         },
         "osint_insights": {
             "performance_rating": performance_rating,
-            "anomaly_detection": "DETECTED"
-            if analysis.get("anomaly_count", 0) > 0
-            else "NONE",
+            "anomaly_detection": "DETECTED" if anomaly_count > 0 else "NONE",
             "potential_issues": potential_issues,
             "investigation_tips": [
                 "Compare response times across different resolvers",
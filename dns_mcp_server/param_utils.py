@@ -3,9 +3,27 @@ Fix for FastMCP integer parameter validation issues.
 This module provides workarounds for known FastMCP parameter type handling issues.
 """
 
+from functools import lru_cache
 from typing import Any, Union
 
 
+@lru_cache(maxsize=256)
+def _parse_int_str(value: str) -> int | None:
+    """
+    Parse a string as an int, caching results for repeated parameter values.
+
+    Args:
+        value: String to convert
+
+    Returns:
+        int or None
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
 def ensure_int(value: Any) -> Union[int, None]:
     """
     Ensure a value is converted to int or None.
@@ -17,19 +35,16 @@ def ensure_int(value: Any) -> Union[int, None]:
     Returns:
         int or None
     """
+    # Already an integer (most common case)
+    if isinstance(value, int):
+        return value
+    
     if value is None:
         return None
     
     # Handle string representation of integers
     if isinstance(value, str):
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return None
-    
-    # Already an integer
-    if isinstance(value, int):
-        return value
+        return _parse_int_str(value)
     
     # Try to convert other types
     try:
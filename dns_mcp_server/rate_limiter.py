@@ -3,13 +3,48 @@ Rate limiting utilities for DNS operations
 Implements per-resolver rate limiting to prevent overwhelming DNS servers
 """
 
-from asyncio_throttle import Throttler
+import asyncio
+import time
+from collections import defaultdict
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` acquisitions per second with bursts up to `rate`
+
+    Each acquire reserves its token up front, letting the balance go negative,
+    and then sleeps off the deficit. The refill-and-reserve step has no await,
+    so it is atomic within the event loop and needs no lock; waiters are
+    served in arrival order.
+    """
+
+    __slots__ = ("rate", "tokens", "ts")
+
+    def __init__(self, rate: float):
+        """
+        Initialize a full bucket
+
+        Args:
+            rate: Tokens added per second, also the bucket capacity
+        """
+        self.rate = rate
+        self.tokens = rate
+        self.ts = time.monotonic()
+
+    async def acquire(self):
+        """Take one token, sleeping until it is available"""
+        now = time.monotonic()
+        tokens = min(self.rate, self.tokens + (now - self.ts) * self.rate) - 1
+        self.tokens = tokens
+        self.ts = now
+        if tokens < 0:
+            await asyncio.sleep(-tokens / self.rate)
 
 
 class DNSRateLimiter:
     """
     Per-resolver rate limiter for DNS operations
-    Maintains separate throttlers for each resolver type
+    Maintains a separate token bucket for each resolver type
     """
 
     def __init__(self, rate_limit: int = 30):
@@ -20,23 +55,20 @@ class DNSRateLimiter:
             rate_limit: Requests per second per resolver (default: 30)
         """
         self.rate_limit = rate_limit
-        self._throttlers: dict[str, Throttler] = {}
+        self._throttlers: defaultdict[str, TokenBucket] = defaultdict(
+            lambda: TokenBucket(self.rate_limit)
+        )
 
-    def get_throttler(self, resolver_type: str) -> Throttler:
+    def get_throttler(self, resolver_type: str) -> TokenBucket:
         """
-        Get or create throttler for resolver type
+        Get or create token bucket for resolver type
 
         Args:
             resolver_type: Resolver identifier (e.g., 'google', 'cloudflare')
 
         Returns:
-            Throttler instance for the resolver
+            TokenBucket instance for the resolver
         """
-        if resolver_type not in self._throttlers:
-            self._throttlers[resolver_type] = Throttler(
-                rate_limit=self.rate_limit,
-                period=1.0,  # Per second
-            )
         return self._throttlers[resolver_type]
 
     async def acquire(self, resolver_type: str):
@@ -46,9 +78,7 @@ class DNSRateLimiter:
         Args:
             resolver_type: Resolver identifier
         """
-        throttler = self.get_throttler(resolver_type)
-        async with throttler:
-            pass  # Token acquired and released automatically
+        await self.get_throttler(resolver_type).acquire()
 
     def get_stats(self) -> dict[str, dict]:
         """
@@ -57,14 +87,16 @@ class DNSRateLimiter:
         Returns:
             Dictionary with stats per resolver
         """
-        stats = {}
-        for resolver_type, throttler in self._throttlers.items():
-            stats[resolver_type] = {
-                "rate_limit": self.rate_limit,
-                "current_tokens": getattr(throttler, "_tokens", "unknown"),
-                "active": bool(self._throttlers.get(resolver_type)),
+        rate_limit = self.rate_limit
+        # Every tracked resolver has a live bucket, so it is always active
+        return {
+            resolver_type: {
+                "rate_limit": rate_limit,
+                "current_tokens": round(throttler.tokens, 2),
+                "active": True,
             }
-        return stats
+            for resolver_type, throttler in self._throttlers.items()
+        }
 
 
 # Global rate limiter instance
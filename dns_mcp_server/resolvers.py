@@ -41,13 +41,66 @@ Note:
     30 requests per second per resolver.
 """
 
+import asyncio
+import itertools
+from collections.abc import Callable
+from functools import lru_cache, partial
 from typing import Any
 
 import aiodns
 
-from .config import RESOLVER_CONFIGS
+from .answer_cache import TTLCache
+from .config import RESOLVER_CONFIGS, SUPPORTED_RECORD_TYPES, config
 from .rate_limiter import dns_rate_limiter
 
+# Record types aiodns is asked for; aiodns takes the type names as-is
+_QUERY_TYPES = frozenset(SUPPORTED_RECORD_TYPES)
+
+# c-ares errors meaning the name or record type does not exist; these are
+# stable answers worth caching, unlike timeouts or server failures
+_NEGATIVE_ERROR_CODES = frozenset(
+    (aiodns.error.ARES_ENOTFOUND, aiodns.error.ARES_ENODATA)
+)
+
+
+def _answer_ttl(result: list[Any]) -> float | None:
+    """Smallest TTL across answer records, or None if none carry a TTL"""
+    ttls = [
+        record.ttl
+        for record in result
+        if isinstance(getattr(record, "ttl", None), int)
+    ]
+    return min(ttls) if ttls else None
+
+
+@lru_cache(maxsize=4096)
+def reverse_domain_name(ip: str) -> str:
+    """
+    Build the reverse DNS (in-addr.arpa / ip6.arpa) name for an IP address
+
+    Results are memoized, so repeat lookups of the same address skip parsing.
+
+    Args:
+        ip: IPv4 or IPv6 address
+
+    Returns:
+        Reverse DNS name
+
+    Raises:
+        dns.exception.SyntaxError: If ip is not a valid address
+    """
+    # Imported lazily so servers that only run forward queries never load it
+    import dns.reversename
+
+    return str(dns.reversename.from_address(ip))
+
+
+def _channel_nameservers(
+    nameservers: list[str] | None, resolver_type: str
+) -> list[str] | None:
+    """Nameservers a resolver's aiodns channel uses, or None for the system's"""
+    return nameservers or RESOLVER_CONFIGS.get(resolver_type)
+
 
 class AsyncDNSResolver:
     """
@@ -59,6 +112,8 @@ class AsyncDNSResolver:
         nameservers: list[str] | None = None,
         resolver_type: str = "system",
         timeout: float = 10.0,
+        use_cache: bool = True,
+        channels: tuple[aiodns.DNSResolver, ...] | None = None,
     ):
         """
         Initialize async DNS resolver
@@ -67,19 +122,56 @@ class AsyncDNSResolver:
             nameservers: Custom nameserver IPs (overrides resolver_type)
             resolver_type: Predefined resolver type or "system"
             timeout: Query timeout in seconds
+            use_cache: Serve repeat queries from a TTL-bounded answer cache and
+                coalesce concurrent identical queries into one upstream lookup
+            channels: Existing aiodns resolvers, already configured for these
+                nameservers and timeout, to share instead of creating
+                config.resolver_channels new ones
         """
         self.resolver_type = resolver_type
         self.timeout = timeout
+        self.answer_cache = (
+            TTLCache(
+                maxsize=config.dns_cache_size,
+                default_ttl=config.dns_cache_ttl,
+                max_ttl=config.dns_cache_max_ttl,
+                min_ttl=config.dns_cache_min_ttl,
+            )
+            if use_cache
+            else None
+        )
+        # Name-does-not-exist / no-data outcomes, keyed like the answer cache
+        self.negative_cache = (
+            TTLCache(
+                maxsize=config.dns_cache_size,
+                default_ttl=config.dns_negative_cache_ttl,
+                max_ttl=config.dns_negative_cache_max_ttl,
+                min_ttl=config.dns_negative_cache_min_ttl,
+            )
+            if use_cache
+            else None
+        )
+        # Upstream lookups in progress, keyed like the answer cache
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+
+        # Create aiodns resolvers and configure nameservers, unless sharing them
+        if channels is None:
+            channel_nameservers = _channel_nameservers(nameservers, resolver_type)
+            channels = tuple(
+                aiodns.DNSResolver(timeout=timeout)
+                for _ in range(config.resolver_channels)
+            )
+            if channel_nameservers:
+                for channel in channels:
+                    channel.nameservers = channel_nameservers
+        self.channels = channels
+        self.resolver = channels[0]
+        # Queries round-robin across the channels
+        self._next_channel = itertools.cycle(channels).__next__
 
-        # Create aiodns resolver
-        self.resolver = aiodns.DNSResolver(timeout=timeout)
-
-        # Configure nameservers
         if nameservers:
-            self.resolver.nameservers = nameservers
             self.resolver_id = f"custom-{'-'.join(nameservers[:2])}"
         elif resolver_type in RESOLVER_CONFIGS:
-            self.resolver.nameservers = RESOLVER_CONFIGS[resolver_type]
             self.resolver_id = resolver_type
         else:
             # Use system default resolvers
@@ -99,43 +191,90 @@ class AsyncDNSResolver:
         Raises:
             Various aiodns exceptions for DNS errors
         """
-        # Apply rate limiting
-        await dns_rate_limiter.acquire(self.resolver_id)
+        # Uppercased once here; everything below works on the canonical name
+        record_type = record_type.upper()
+        if self.answer_cache is None:
+            return await self._query_upstream(domain, record_type)
+
+        cache_key = (domain.lower(), record_type)
+        cached = self.answer_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        # Re-raise a cached NXDOMAIN/NODATA as a fresh error, so tracebacks
+        # don't pile up on a shared exception instance
+        cached_error = self.negative_cache.get(cache_key)
+        if cached_error is not None:
+            raise aiodns.error.DNSError(*cached_error)
+
+        # Join an identical lookup already in flight rather than sending another
+        lookup = self._inflight.get(cache_key)
+        if lookup is None:
+            lookup = asyncio.create_task(
+                self._query_upstream(domain, record_type, cache_key)
+            )
+            self._inflight[cache_key] = lookup
+            lookup.add_done_callback(partial(self._finish_lookup, cache_key))
+
+        # Every caller, the first included, waits through shield so cancelling
+        # one of them leaves the shared lookup running for the rest
+        return list(await asyncio.shield(lookup))
+
+    def _finish_lookup(self, cache_key: tuple[str, str], lookup: asyncio.Task):
+        """
+        Drop a finished upstream lookup from the in-flight table
+
+        Args:
+            cache_key: Key the lookup was registered under
+            lookup: The finished lookup task
+        """
+        if self._inflight.get(cache_key) is lookup:
+            del self._inflight[cache_key]
+        if not lookup.cancelled():
+            lookup.exception()  # Mark retrieved in case every caller went away
 
-        # Map record types to aiodns query types
-        query_type_map = {
-            "A": "A",
-            "AAAA": "AAAA",
-            "MX": "MX",
-            "TXT": "TXT",
-            "NS": "NS",
-            "SOA": "SOA",
-            "CNAME": "CNAME",
-            "CAA": "CAA",
-            "SRV": "SRV",
-            "PTR": "PTR",
-        }
-
-        aiodns_type = query_type_map.get(record_type.upper())
-        if not aiodns_type:
+    async def _query_upstream(
+        self,
+        domain: str,
+        record_type: str,
+        cache_key: tuple[str, str] | None = None,
+    ) -> list[str]:
+        """
+        Send a rate-limited query to the nameservers
+
+        Args:
+            domain: Domain to query
+            record_type: Uppercase DNS record type (A, AAAA, MX, etc.)
+            cache_key: Answer cache key to store the result under (optional)
+
+        Returns:
+            List of formatted DNS records
+        """
+        # Reject unsupported types before spending a rate-limit token
+        if record_type not in _QUERY_TYPES:
             raise ValueError(f"Unsupported record type: {record_type}")
 
+        # Apply rate limiting
+        await dns_rate_limiter.acquire(self.resolver_id)
+
         # Perform async DNS query
         try:
-            result = await self.resolver.query(domain, aiodns_type)
+            result = await self._next_channel().query(domain, record_type)
 
             # Format results based on record type
-            if isinstance(result, list):
-                return [
-                    self._format_record(record_type.upper(), record)
-                    for record in result
-                ]
-            else:
-                return [self._format_record(record_type.upper(), result)]
-
-        except Exception as e:
-            # Re-raise with consistent error types for handling
-            raise e
+            if not isinstance(result, list):
+                result = [result]
+            format_record = _RECORD_FORMATTERS.get(record_type, _format_default)
+            records = [format_record(record) for record in result]
+
+            if cache_key is not None:
+                self.answer_cache.set(cache_key, records, ttl=_answer_ttl(result))
+            return records
+
+        except aiodns.error.DNSError as e:
+            if cache_key is not None and e.args and e.args[0] in _NEGATIVE_ERROR_CODES:
+                self.negative_cache.set(cache_key, e.args)
+            raise
 
     def _format_record(self, record_type: str, record: Any) -> str:
         """
@@ -148,73 +287,154 @@ class AsyncDNSResolver:
         Returns:
             Formatted record string
         """
-        if record_type == "MX":
-            # Handle both aiodns (priority/host) and RFC standard (preference/exchange) formats
-            if hasattr(record, "priority") and hasattr(record, "host"):
-                return f"{record.priority} {record.host}"
-            elif hasattr(record, "preference") and hasattr(record, "exchange"):
-                return f"{record.preference} {record.exchange}"
-            else:
-                return str(record)
-        elif record_type == "SOA":
-            # Handle pycares SOA result structure (different from standard)
-            # pycares uses: nsname, hostmaster, serial, refresh, retry, expires, minttl
-            if hasattr(record, "nsname"):
-                return f"{record.nsname} {record.hostmaster} {record.serial} {record.refresh} {record.retry} {record.expires} {record.minttl}"
-            # Fallback for other implementations
-            elif hasattr(record, "mname"):
-                return f"{record.mname} {record.rname} {record.serial} {record.refresh} {record.retry} {record.expire} {record.minimum}"
-            else:
-                return str(record)
-        elif record_type == "TXT":
-            # Handle TXT records which can be bytes or strings
-            if hasattr(record, "text"):
-                text = record.text
-                if isinstance(text, bytes):
-                    return text.decode("utf-8", errors="replace")
-                return str(text)
-            return str(record)
-        elif record_type == "SRV":
-            return f"{record.priority} {record.weight} {record.port} {record.target}"
-        elif record_type == "CAA":
-            # Handle pycares CAA result structure
-            # pycares uses: critical, property, value
-            if hasattr(record, "critical"):
-                return f"{record.critical} {record.property} {record.value}"
-            # Fallback for standard format
-            elif hasattr(record, "flags"):
-                return f"{record.flags} {record.tag} {record.value}"
-            else:
-                return str(record)
-        elif record_type == "NS":
-            return str(record.host if hasattr(record, "host") else record)
-        else:
-            # Default formatting for A, AAAA, CNAME, PTR
-            if hasattr(record, "host"):
-                return str(record.host)
-            elif hasattr(record, "name"):
-                return str(record.name)
-            else:
-                return str(record)
+        return _RECORD_FORMATTERS.get(record_type, _format_default)(record)
+
+
+def _format_mx(record: Any) -> str:
+    # Handle both aiodns (priority/host) and RFC standard (preference/exchange) formats
+    if hasattr(record, "priority") and hasattr(record, "host"):
+        return f"{record.priority} {record.host}"
+    elif hasattr(record, "preference") and hasattr(record, "exchange"):
+        return f"{record.preference} {record.exchange}"
+    else:
+        return str(record)
+
+
+def _format_soa(record: Any) -> str:
+    # Handle pycares SOA result structure (different from standard)
+    # pycares uses: nsname, hostmaster, serial, refresh, retry, expires, minttl
+    if hasattr(record, "nsname"):
+        return f"{record.nsname} {record.hostmaster} {record.serial} {record.refresh} {record.retry} {record.expires} {record.minttl}"
+    # Fallback for other implementations
+    elif hasattr(record, "mname"):
+        return f"{record.mname} {record.rname} {record.serial} {record.refresh} {record.retry} {record.expire} {record.minimum}"
+    else:
+        return str(record)
+
+
+def _format_txt(record: Any) -> str:
+    # Handle TXT records which can be bytes or strings; c-ares has already
+    # joined the record's character-strings, so this is a single decode
+    text = getattr(record, "text", record)
+    if isinstance(text, bytes):
+        return text.decode("utf-8", errors="replace")
+    return str(text)
+
+
+def _format_srv(record: Any) -> str:
+    return f"{record.priority} {record.weight} {record.port} {record.target}"
+
+
+def _format_caa(record: Any) -> str:
+    # Handle pycares CAA result structure
+    # pycares uses: critical, property, value
+    if hasattr(record, "critical"):
+        return f"{record.critical} {record.property} {record.value}"
+    # Fallback for standard format
+    elif hasattr(record, "flags"):
+        return f"{record.flags} {record.tag} {record.value}"
+    else:
+        return str(record)
+
+
+def _format_ns(record: Any) -> str:
+    return str(record.host if hasattr(record, "host") else record)
+
+
+def _format_default(record: Any) -> str:
+    # Default formatting for A, AAAA, CNAME, PTR
+    if hasattr(record, "host"):
+        return str(record.host)
+    elif hasattr(record, "name"):
+        return str(record.name)
+    else:
+        return str(record)
+
+
+# Per-type record formatters; types not listed use _format_default
+_RECORD_FORMATTERS: dict[str, Callable[[Any], str]] = {
+    "MX": _format_mx,
+    "SOA": _format_soa,
+    "TXT": _format_txt,
+    "SRV": _format_srv,
+    "CAA": _format_caa,
+    "NS": _format_ns,
+}
+
+
+# Shared resolvers keyed by (event loop, nameserver, resolver_type, timeout,
+# use_cache); resolver_type is None for custom nameservers
+# aiodns resolvers are bound to the loop they were created on, so the loop is
+# part of the key and entries for closed loops are pruned
+_resolver_pool: dict[tuple, AsyncDNSResolver] = {}
+
+# aiodns channels keyed by (event loop, nameservers, timeout); pooled resolvers
+# that differ only in caching share the same channels and their sockets
+_channel_pool: dict[tuple, tuple[aiodns.DNSResolver, ...]] = {}
+
+
+def _prune_resolver_pool():
+    """Drop pooled resolvers and channels whose event loop has closed"""
+    for pool in (_resolver_pool, _channel_pool):
+        for key in [key for key in pool if key[0].is_closed()]:
+            del pool[key]
 
 
 def create_resolver(
     nameserver: str | None = None,
     resolver_type: str = "system",
     timeout: float = 10.0,
+    use_cache: bool = True,
 ) -> AsyncDNSResolver:
     """
     Factory function to create async DNS resolver
 
+    Inside a running event loop, resolvers are pooled and reused for identical
+    settings, so repeated tool calls skip c-ares channel setup.
+
     Args:
         nameserver: Custom nameserver IP (overrides resolver_type)
         resolver_type: Predefined resolver type
         timeout: Query timeout in seconds
+        use_cache: Serve repeat queries from the resolver's answer cache
 
     Returns:
         Configured AsyncDNSResolver instance
     """
     nameservers = [nameserver] if nameserver else None
-    return AsyncDNSResolver(
-        nameservers=nameservers, resolver_type=resolver_type, timeout=timeout
-    )
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No running loop - nothing to share the resolver with
+        return AsyncDNSResolver(
+            nameservers=nameservers,
+            resolver_type=resolver_type,
+            timeout=timeout,
+            use_cache=use_cache,
+        )
+
+    # resolver_type is ignored once a nameserver is given, so leave it out of
+    # the key and let every caller of that nameserver share one resolver
+    key = (loop, nameserver, None if nameserver else resolver_type, timeout, use_cache)
+    resolver = _resolver_pool.get(key)
+    if resolver is None:
+        _prune_resolver_pool()
+        if len(_resolver_pool) >= config.resolver_pool_size:
+            # Evict the oldest entry
+            del _resolver_pool[next(iter(_resolver_pool))]
+        if len(_channel_pool) >= config.resolver_pool_size:
+            del _channel_pool[next(iter(_channel_pool))]
+
+        channel_servers = _channel_nameservers(nameservers, resolver_type)
+        channel_key = (loop, tuple(channel_servers or ()), timeout)
+        resolver = AsyncDNSResolver(
+            nameservers=nameservers,
+            resolver_type=resolver_type,
+            timeout=timeout,
+            use_cache=use_cache,
+            channels=_channel_pool.get(channel_key),
+        )
+        _channel_pool[channel_key] = resolver.channels
+        _resolver_pool[key] = resolver
+    return resolver
@@ -16,8 +16,25 @@ from . import core_tools  # noqa: F401
 from . import osint_tools  # noqa: F401
 
 
+def install_uvloop() -> bool:
+    """
+    Use uvloop for the asyncio event loop when it is installed
+
+    Returns:
+        True if uvloop was installed, False if it is unavailable
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    uvloop.install()
+    return True
+
+
 def main():
     """Main entry point for the DNS MCP server"""
+    install_uvloop()
     mcp.run()
 
 
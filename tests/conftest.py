@@ -0,0 +1,116 @@
+"""
+Shared pytest configuration
+"""
+
+import asyncio
+import socket
+from functools import lru_cache
+from unittest.mock import AsyncMock
+
+import pytest
+
+from dns_mcp_server import resolvers
+
+
+def pytest_addoption(parser):
+    """Register the opt-in flag for network-dependent tests"""
+    parser.addoption(
+        "--integration",
+        action="store_true",
+        default=False,
+        help="run integration tests that query real DNS servers",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Deselect integration tests unless --integration is given"""
+    if config.getoption("--integration"):
+        return
+
+    selected = []
+    deselected = []
+    for item in items:
+        if "integration" in item.keywords:
+            deselected.append(item)
+        else:
+            selected.append(item)
+
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run async tests on uvloop when it is installed, like the server does"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+
+    return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def app_config():
+    """Server configuration, imported on first use rather than at collection"""
+    from dns_mcp_server.config import config
+
+    return config
+
+
+@pytest.fixture(scope="session")
+def dns_available():
+    """Whether the system resolver can answer, probed once per session"""
+    try:
+        socket.getaddrinfo("example.com", 53, proto=socket.IPPROTO_UDP)
+    except OSError:
+        return False
+    return True
+
+
+@pytest.fixture
+def requires_dns(dns_available):
+    """Skip a test that sends real DNS queries when DNS is unreachable"""
+    if not dns_available:
+        pytest.skip("DNS resolution unavailable")
+
+
+@pytest.fixture(scope="session")
+def cached_resolver():
+    """
+    create_resolver memoized for the whole session
+
+    Only for tests that inspect resolver attributes; tests that send queries
+    must use their own resolvers so caches and in-flight state cannot leak.
+    """
+    return lru_cache(maxsize=None)(resolvers.create_resolver)
+
+
+@pytest.fixture(autouse=True)
+def reset_resolver_pools():
+    """Give each test fresh pooled resolvers, even when tests share a loop"""
+    yield
+    resolvers._resolver_pool.clear()
+    resolvers._channel_pool.clear()
+
+
+@pytest.fixture
+def mock_resolver(monkeypatch):
+    """AsyncMock resolver returned by create_resolver in every tool module"""
+    resolver = AsyncMock(spec=resolvers.AsyncDNSResolver)
+    resolver.resolver_id = "test_resolver"
+
+    def create_mock_resolver(*args, **kwargs):
+        return resolver
+
+    monkeypatch.setattr(
+        "dns_mcp_server.core_tools.create_resolver", create_mock_resolver
+    )
+    monkeypatch.setattr(
+        "dns_mcp_server.bulk_tools.create_resolver", create_mock_resolver
+    )
+    monkeypatch.setattr(
+        "dns_mcp_server.osint_tools.create_resolver", create_mock_resolver
+    )
+    return resolver
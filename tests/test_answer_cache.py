@@ -0,0 +1,90 @@
+"""
+Tests for the TTL-bounded DNS answer cache
+Testing expiry, TTL capping, and size-bounded eviction
+"""
+
+from unittest.mock import patch
+
+from dns_mcp_server.answer_cache import TTLCache
+
+
+class TestTTLCache:
+    """Test the TTL answer cache"""
+
+    def test_get_and_set(self):
+        """Test cached values are returned while fresh"""
+        cache = TTLCache()
+        cache.set(("example.com", "A"), ["192.168.1.1"], ttl=60)
+
+        assert cache.get(("example.com", "A")) == ["192.168.1.1"]
+        assert cache.get(("example.com", "MX")) is None
+        assert len(cache) == 1
+
+    def test_entry_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = TTLCache()
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value", ttl=30)
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=129.0):
+            assert cache.get("key") == "value"
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=130.0):
+            assert cache.get("key") is None
+
+        assert len(cache) == 0
+
+    def test_ttl_defaults_and_cap(self):
+        """Test missing TTLs use the default and large TTLs are capped"""
+        cache = TTLCache(default_ttl=10, max_ttl=50)
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=0.0):
+            cache.set("default", "value")
+            cache.set("capped", "value", ttl=86400)
+            cache.set("zero", "value", ttl=0)
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=20.0):
+            assert cache.get("default") is None
+            assert cache.get("capped") == "value"
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=50.0):
+            assert cache.get("capped") is None
+
+        assert cache.get("zero") is None
+
+    def test_min_ttl_floor(self):
+        """Test short TTLs are raised to the floor but zero is not cached"""
+        cache = TTLCache(min_ttl=60)
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=0.0):
+            cache.set("short", "value", ttl=5)
+            cache.set("zero", "value", ttl=0)
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=59.0):
+            assert cache.get("short") == "value"
+            assert cache.get("zero") is None
+
+        with patch("dns_mcp_server.answer_cache.time.monotonic", return_value=60.0):
+            assert cache.get("short") is None
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted when full"""
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_clear(self):
+        """Test clearing the cache"""
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.get("a") is None
@@ -3,14 +3,30 @@ Tests for async DNS functionality
 Testing the new async core tools and bulk operations
 """
 
+import asyncio
+import time
 from unittest.mock import AsyncMock, Mock, patch
 
+import aiodns
 import pytest
 
-from dns_mcp_server.bulk_tools import dns_bulk_query
+from dns_mcp_server.bulk_tools import (
+    DomainResult,
+    dns_bulk_query,
+    dns_bulk_reverse_lookup,
+    run_bounded,
+)
+from dns_mcp_server.config import config
 from dns_mcp_server.core_tools import dns_query, dns_query_all
 from dns_mcp_server.rate_limiter import DNSRateLimiter
-from dns_mcp_server.resolvers import create_resolver
+from dns_mcp_server.resolvers import (
+    AsyncDNSResolver,
+    create_resolver,
+    reverse_domain_name,
+)
+
+# Outer bound on each real-network call, in case a tool's own timeout never fires
+_INTEGRATION_DEADLINE = 30
 
 
 class TestAsyncDNSResolver:
@@ -32,6 +48,56 @@ class TestAsyncDNSResolver:
         resolver = create_resolver(nameserver="8.8.8.8")
         assert "custom" in resolver.resolver_id
 
+    async def test_resolver_pooling(self):
+        """Test identical resolver settings share one pooled instance"""
+        resolver1 = create_resolver(resolver_type="google", timeout=5.0)
+        resolver2 = create_resolver(resolver_type="google", timeout=5.0)
+        resolver3 = create_resolver(resolver_type="cloudflare", timeout=5.0)
+
+        assert resolver1 is resolver2
+        assert resolver1 is not resolver3
+
+        # A custom nameserver is shared whatever resolver_type accompanies it
+        custom1 = create_resolver(nameserver="8.8.8.8", resolver_type="custom")
+        custom2 = create_resolver(nameserver="8.8.8.8")
+        assert custom1 is custom2
+
+        # Resolvers differing only in caching share one aiodns channel
+        uncached = create_resolver(nameserver="8.8.8.8", use_cache=False)
+        assert uncached is not custom1
+        assert uncached.resolver is custom1.resolver
+        assert uncached.resolver.nameservers == ["8.8.8.8"]
+
+    @patch("aiodns.DNSResolver.query", autospec=True)
+    async def test_resolver_channels_round_robin(self, mock_query):
+        """Test queries are spread across the resolver's aiodns channels"""
+        used_channels = []
+
+        async def async_mock_result(channel, domain, record_type):
+            used_channels.append(channel)
+            return []
+
+        mock_query.side_effect = async_mock_result
+
+        resolver = create_resolver(resolver_type="google", use_cache=False)
+        assert len(resolver.channels) == config.resolver_channels
+        assert resolver.resolver is resolver.channels[0]
+        for channel in resolver.channels:
+            assert channel.nameservers == ["8.8.8.8", "8.8.4.4"]
+
+        for _ in range(2 * config.resolver_channels):
+            await resolver.query("example.com", "A")
+
+        assert used_channels == list(resolver.channels) * 2
+
+    def test_reverse_domain_name_cached(self):
+        """Test reverse DNS names are built correctly and memoized"""
+        reverse_domain_name.cache_clear()
+
+        assert reverse_domain_name("8.8.8.8") == "8.8.8.8.in-addr.arpa."
+        assert reverse_domain_name("8.8.8.8") == "8.8.8.8.in-addr.arpa."
+        assert reverse_domain_name.cache_info().hits == 1
+
     @patch("aiodns.DNSResolver.query")
     async def test_successful_query(self, mock_query):
         """Test successful DNS query"""
@@ -52,6 +118,104 @@ class TestAsyncDNSResolver:
         assert result == ["192.168.1.1"]
         mock_query.assert_called_once_with("example.com", "A")
 
+    @patch("aiodns.DNSResolver.query")
+    async def test_query_answer_cache(self, mock_query):
+        """Test repeat queries are served from the answer cache"""
+        mock_record = Mock()
+        mock_record.host = "192.168.1.1"
+        mock_record.ttl = 300
+
+        async def async_mock_result():
+            return [mock_record]
+
+        mock_query.side_effect = lambda *args: async_mock_result()
+
+        resolver = create_resolver(resolver_type="quad9")
+        first = await resolver.query("Example.com", "A")
+        second = await resolver.query("example.com", "a")
+
+        assert first == second == ["192.168.1.1"]
+        assert mock_query.call_count == 1
+
+        uncached = create_resolver(resolver_type="quad9", use_cache=False)
+        await uncached.query("example.com", "A")
+        await uncached.query("example.com", "A")
+        assert mock_query.call_count == 3
+
+    @patch("aiodns.DNSResolver.query")
+    async def test_query_coalesces_concurrent_misses(self, mock_query):
+        """Test concurrent identical queries share one upstream lookup"""
+        mock_record = Mock()
+        mock_record.host = "192.168.1.1"
+        mock_record.ttl = 300
+
+        async def slow_result():
+            await asyncio.sleep(0.05)
+            return [mock_record]
+
+        mock_query.side_effect = lambda *args: slow_result()
+
+        resolver = create_resolver(resolver_type="quad9")
+        results = await asyncio.gather(
+            *(resolver.query("example.com", "A") for _ in range(5))
+        )
+
+        assert results == [["192.168.1.1"]] * 5
+        assert results[0] is not results[1]  # Each caller gets its own list
+        assert mock_query.call_count == 1
+
+    @patch("aiodns.DNSResolver.query")
+    async def test_coalesced_query_survives_first_caller_cancel(self, mock_query):
+        """Test cancelling the first caller doesn't cancel callers that joined it"""
+        mock_record = Mock()
+        mock_record.host = "192.168.1.1"
+        mock_record.ttl = 300
+
+        async def slow_result():
+            await asyncio.sleep(0.2)
+            return [mock_record]
+
+        mock_query.side_effect = lambda *args: slow_result()
+
+        resolver = create_resolver(resolver_type="quad9")
+        first = asyncio.create_task(resolver.query("example.com", "A"))
+        await asyncio.sleep(0)  # Let the first caller start the lookup
+        second = asyncio.create_task(resolver.query("example.com", "A"))
+        await asyncio.sleep(0)
+
+        first.cancel()
+
+        assert await second == ["192.168.1.1"]
+        assert first.cancelled()
+        assert mock_query.call_count == 1
+
+    @patch("aiodns.DNSResolver.query")
+    async def test_query_negative_cache(self, mock_query):
+        """Test NXDOMAIN is cached but transient failures are not"""
+
+        async def async_mock_error(domain, record_type):
+            if domain == "missing.example.com":
+                raise aiodns.error.DNSError(
+                    aiodns.error.ARES_ENOTFOUND, "Domain name not found"
+                )
+            raise aiodns.error.DNSError(
+                aiodns.error.ARES_ESERVFAIL, "DNS server returned general failure"
+            )
+
+        mock_query.side_effect = async_mock_error
+
+        resolver = create_resolver(resolver_type="quad9")
+        for _ in range(2):
+            with pytest.raises(aiodns.error.DNSError) as exc_info:
+                await resolver.query("missing.example.com", "A")
+            assert exc_info.value.args[0] == aiodns.error.ARES_ENOTFOUND
+        assert mock_query.call_count == 1
+
+        for _ in range(2):
+            with pytest.raises(aiodns.error.DNSError):
+                await resolver.query("broken.example.com", "A")
+        assert mock_query.call_count == 3
+
     @patch("aiodns.DNSResolver.query")
     async def test_query_exception_handling(self, mock_query):
         """Test DNS query exception handling"""
@@ -94,6 +258,17 @@ class TestRateLimiter:
         await limiter.acquire("test_resolver")
         await limiter.acquire("test_resolver")
 
+    async def test_rate_limit_enforced_after_burst(self):
+        """Test acquisitions beyond the burst wait for tokens to refill"""
+        limiter = DNSRateLimiter(rate_limit=20)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire("test_resolver") for _ in range(25)))
+        elapsed = time.perf_counter() - start
+
+        # 20 tokens are available immediately; the other 5 refill at 20/s
+        assert elapsed >= 0.2
+
     def test_get_stats(self):
         """Test rate limiter statistics"""
         limiter = DNSRateLimiter(rate_limit=25)
@@ -109,14 +284,9 @@ class TestRateLimiter:
 class TestAsyncDNSTools:
     """Test async DNS tools"""
 
-    @patch("dns_mcp_server.core_tools.create_resolver")
-    async def test_dns_query_success(self, mock_create_resolver):
+    async def test_dns_query_success(self, mock_resolver):
         """Test successful dns_query"""
-        # Mock resolver
-        mock_resolver = AsyncMock()
         mock_resolver.query.return_value = ["192.168.1.1"]
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_query(
             domain="example.com", record_type="A", resolver_type="google"
@@ -129,14 +299,57 @@ class TestAsyncDNSTools:
         assert "query_time_seconds" in result
         assert "error" not in result
 
-    @patch("dns_mcp_server.core_tools.create_resolver")
-    async def test_dns_query_error(self, mock_create_resolver):
+    @patch("aiodns.DNSResolver.query")
+    async def test_dns_query_coalesces_duplicates(self, mock_query):
+        """Test concurrent identical dns_query calls share one upstream lookup"""
+        mock_record = Mock()
+        mock_record.host = "192.168.1.1"
+        mock_record.ttl = 300
+
+        async def slow_result():
+            await asyncio.sleep(0.05)
+            return [mock_record]
+
+        mock_query.side_effect = lambda *args: slow_result()
+
+        results = await asyncio.gather(
+            dns_query(domain="example.com", record_type="A", resolver_type="quad9"),
+            dns_query(domain="example.com", record_type="A", resolver_type="quad9"),
+        )
+
+        assert [result["records"] for result in results] == [["192.168.1.1"]] * 2
+        assert mock_query.call_count == 1
+
+    @patch("aiodns.DNSResolver.query")
+    async def test_dns_query_cache_hit(self, mock_query):
+        """Test repeated dns_query and dns_query_all lookups reuse cached answers"""
+        mock_record = Mock()
+        mock_record.host = "192.168.1.1"
+        mock_record.ttl = 300
+
+        async def async_mock_result(domain, record_type):
+            if record_type != "A":
+                raise aiodns.error.DNSError(
+                    aiodns.error.ARES_ENODATA, "DNS server returned answer with no data"
+                )
+            return [mock_record]
+
+        mock_query.side_effect = async_mock_result
+
+        first = await dns_query(domain="example.com", resolver_type="quad9")
+        second = await dns_query(domain="example.com", resolver_type="quad9")
+        assert first["records"] == second["records"] == ["192.168.1.1"]
+        assert mock_query.call_count == 1
+
+        # Answers and NODATA results both come from cache on the second pass
+        await dns_query_all(domain="example.com", resolver_type="quad9")
+        calls = mock_query.call_count
+        await dns_query_all(domain="example.com", resolver_type="quad9")
+        assert mock_query.call_count == calls
+
+    async def test_dns_query_error(self, mock_resolver):
         """Test dns_query with DNS error"""
-        # Mock resolver that raises exception
-        mock_resolver = AsyncMock()
         mock_resolver.query.side_effect = Exception("NXDOMAIN")
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_query(domain="nonexistent.example.com", record_type="A")
 
@@ -144,12 +357,8 @@ class TestAsyncDNSTools:
         assert "error" in result
         assert "records" not in result
 
-    @patch("dns_mcp_server.core_tools.create_resolver")
-    async def test_dns_query_all_concurrent(self, mock_create_resolver):
+    async def test_dns_query_all_concurrent(self, mock_resolver):
         """Test dns_query_all concurrent execution"""
-        # Mock resolver
-        mock_resolver = AsyncMock()
-
         # Mock different responses for different record types
         async def mock_query(domain, record_type):
             if record_type == "A":
@@ -160,8 +369,6 @@ class TestAsyncDNSTools:
                 raise Exception("No records")
 
         mock_resolver.query.side_effect = mock_query
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_query_all(domain="example.com")
 
@@ -176,14 +383,9 @@ class TestAsyncDNSTools:
 class TestBulkOperations:
     """Test bulk DNS operations"""
 
-    @patch("dns_mcp_server.bulk_tools.create_resolver")
-    async def test_bulk_query_success(self, mock_create_resolver):
+    async def test_bulk_query_success(self, mock_resolver):
         """Test successful bulk DNS query"""
-        # Mock resolver
-        mock_resolver = AsyncMock()
         mock_resolver.query.return_value = ["192.168.1.1"]
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         domains = ["example1.com", "example2.com", "example3.com"]
         result = await dns_bulk_query(domains=domains, record_type="A", max_workers=2)
@@ -209,20 +411,15 @@ class TestBulkOperations:
         assert result["failed_queries"] == 0
         assert result["results"] == []
 
-    @patch("dns_mcp_server.bulk_tools.create_resolver")
-    async def test_bulk_query_mixed_results(self, mock_create_resolver):
+    async def test_bulk_query_mixed_results(self, mock_resolver):
         """Test bulk query with mixed success/failure"""
         # Mock resolver with mixed responses
-        mock_resolver = AsyncMock()
-
         async def mock_query(domain, record_type):
             if "fail" in domain:
                 raise Exception("NXDOMAIN")
             return ["192.168.1.1"]
 
         mock_resolver.query.side_effect = mock_query
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         domains = ["success.com", "fail.com", "success2.com"]
         result = await dns_bulk_query(domains=domains)
@@ -238,6 +435,140 @@ class TestBulkOperations:
         assert len(errors) == 1
         assert len(successes) == 2
 
+    @patch("dns_mcp_server.bulk_tools.create_resolver")
+    async def test_bulk_query_invalid_record_type(self, mock_create_resolver):
+        """Test unsupported record type fails once without querying"""
+        domains = ["a.com", "b.com", "c.com"]
+        result = await dns_bulk_query(
+            domains=domains, record_type="BOGUS", nameserver="9.9.9.9"
+        )
+
+        mock_create_resolver.assert_not_called()
+        assert result["nameserver"] == "9.9.9.9"
+        assert result["domain_count"] == 3
+        assert result["failed_queries"] == 3
+        assert result["results"] == []
+        assert "Unsupported record type" in result["error"]["details"]
+
+    async def test_bulk_query_deduplicates_domains(self, mock_resolver):
+        """Test duplicate domains are queried once and fanned back out"""
+        mock_resolver.query.return_value = ["192.168.1.1"]
+
+        domains = ["a.com", "b.com", "a.com", "a.com"]
+        result = await dns_bulk_query(domains=domains)
+
+        assert mock_resolver.query.call_count == 2
+        assert result["domain_count"] == 4
+        assert result["unique_domain_count"] == 2
+        assert result["successful_queries"] == 4
+        assert [r["domain"] for r in result["results"]] == domains
+
+    async def test_bulk_query_columnar(self, mock_resolver):
+        """Test columnar bulk results are parallel lists in request order"""
+
+        async def mock_query(domain, record_type):
+            if domain == "bad.com":
+                raise Exception("NXDOMAIN")
+            return ["192.168.1.1"]
+
+        mock_resolver.query.side_effect = mock_query
+
+        domains = ["a.com", "bad.com", "a.com"]
+        result = await dns_bulk_query(domains=domains, columnar=True)
+
+        columns = result["columns"]
+        assert "results" not in result
+        assert columns["domains"] == domains
+        assert columns["records"] == [["192.168.1.1"], None, ["192.168.1.1"]]
+        assert columns["errors"][0] is None
+        assert columns["errors"][1]["error"] == "domain_not_found"
+        assert len(columns["query_time_seconds"]) == 3
+        assert result["successful_queries"] == 2
+        assert result["failed_queries"] == 1
+
+    async def test_bulk_query_clamps_max_workers(self, mock_resolver):
+        """Test max_workers is capped at the configured safety limit"""
+        in_flight = 0
+        peak = 0
+
+        async def mock_query(domain, record_type):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return ["192.168.1.1"]
+
+        mock_resolver.query.side_effect = mock_query
+
+        domains = [f"host{i}.example.com" for i in range(100)]
+        result = await dns_bulk_query(domains=domains, max_workers="1000")
+
+        assert result["successful_queries"] == 100
+        assert peak == config.max_concurrent_workers
+
+    @patch("dns_mcp_server.bulk_tools.create_resolver")
+    async def test_bulk_reverse_lookup_shared_resolver(self, mock_create_resolver):
+        """Test bulk reverse lookup builds one resolver and skips invalid IPs"""
+        mock_resolver = AsyncMock(spec=AsyncDNSResolver)
+        mock_resolver.query.return_value = ["dns.google."]
+        mock_resolver.resolver_id = "test_resolver"
+        mock_create_resolver.return_value = mock_resolver
+
+        ips = ["8.8.8.8", "not.an.ip", "8.8.4.4"]
+        result = await dns_bulk_reverse_lookup(ips=ips)
+
+        assert mock_create_resolver.call_count == 1
+        assert mock_resolver.query.call_count == 2
+        assert result["ip_count"] == 3
+        assert result["unique_ip_count"] == 3
+        assert result["successful_queries"] == 2
+        assert result["failed_queries"] == 1
+        assert result["results"][0]["reverse_domain"] == "8.8.8.8.in-addr.arpa."
+        assert "error" in result["results"][1]
+
+    def test_domain_result_as_dict(self):
+        """Test DomainResult converts to the bulk response shape"""
+        success = DomainResult("a.com", "A", 0.01, records=["192.168.1.1"])
+        failure = DomainResult("b.com", "A", 0.02, error={"error": "timeout"})
+
+        assert success.as_dict() == {
+            "domain": "a.com",
+            "record_type": "A",
+            "records": ["192.168.1.1"],
+            "record_count": 1,
+            "query_time_seconds": 0.01,
+        }
+        assert failure.as_dict()["error"] == {"error": "timeout"}
+        assert "records" not in failure.as_dict()
+
+    async def test_run_bounded_limits_concurrency(self):
+        """Test bounded runner keeps job order and never exceeds the limit"""
+        in_flight = 0
+        peak = 0
+
+        async def handler(value):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if value == 3:
+                raise ValueError("bad job")
+            return value * 2
+
+        results = await run_bounded(
+            handler,
+            [(i,) for i in range(10)],
+            3,
+            on_error=lambda job, error: f"failed {job[0]}: {error}",
+        )
+
+        assert peak <= 3
+        assert results[:3] == [0, 2, 4]
+        assert results[3] == "failed 3: bad job"
+        assert results[9] == 18
+
 
 class TestIntegration:
     """Integration tests with real domains (limited to avoid hitting rate limits)"""
@@ -246,8 +577,11 @@ class TestIntegration:
     async def test_real_domain_query(self):
         """Test query against a real domain"""
         # Use a reliable domain for testing
-        result = await dns_query(
-            domain="sans.com", record_type="A", resolver_type="google", timeout=5
+        result = await asyncio.wait_for(
+            dns_query(
+                domain="sans.com", record_type="A", resolver_type="google", timeout=5
+            ),
+            _INTEGRATION_DEADLINE,
         )
 
         # Should succeed or have a meaningful error
@@ -265,12 +599,15 @@ class TestIntegration:
         """Test bulk query against real domains"""
         domains = ["sans.com", "hackthissite.org"]
 
-        result = await dns_bulk_query(
-            domains=domains,
-            record_type="A",
-            resolver_type="cloudflare",
-            timeout=5,
-            max_workers=2,
+        result = await asyncio.wait_for(
+            dns_bulk_query(
+                domains=domains,
+                record_type="A",
+                resolver_type="cloudflare",
+                timeout=5,
+                max_workers=2,
+            ),
+            _INTEGRATION_DEADLINE,
         )
 
         assert result["domain_count"] == 2
@@ -279,4 +616,4 @@ class TestIntegration:
 
 
 # Test configuration
-pytestmark = pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio(loop_scope="session")
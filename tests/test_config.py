@@ -3,6 +3,8 @@ Tests for configuration management and validation
 Testing centralized configuration, validation, and utility functions
 """
 
+import dataclasses
+
 import pytest
 
 from dns_mcp_server.config import (
@@ -64,6 +66,13 @@ class TestDNSServerConfig:
         # Test too high count
         assert config.validate_wildcard_count(20) == config.max_wildcard_test_count
 
+    def test_configuration_is_immutable(self):
+        """Test configuration cannot be mutated at runtime"""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.default_timeout = 5.0
+
+        assert not hasattr(config, "__dict__")
+
     def test_performance_thresholds(self):
         """Test performance threshold configuration"""
         thresholds = config.performance_thresholds
@@ -167,11 +176,10 @@ class TestResolverConfigurations:
 
     def test_major_dns_providers_included(self):
         """Test that major DNS providers are included"""
-        expected_providers = ["google", "cloudflare", "quad9", "opendns"]
+        expected_providers = {"google", "cloudflare", "quad9", "opendns"}
 
-        for provider in expected_providers:
-            assert provider in RESOLVER_CONFIGS
-            assert provider in DEFAULT_PROPAGATION_RESOLVERS
+        assert expected_providers <= RESOLVER_CONFIGS.keys()
+        assert expected_providers <= DEFAULT_PROPAGATION_RESOLVERS.keys()
 
 
 class TestSupportedRecordTypes:
@@ -282,4 +290,4 @@ class TestConfigurationIntegration:
 
 
 # Test configuration
-pytestmark = pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio(loop_scope="session")
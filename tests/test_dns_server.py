@@ -3,11 +3,17 @@ Test suite for DNS MCP Server (Legacy compatibility tests)
 Tests to ensure our new async architecture maintains compatibility
 """
 
+import asyncio
+from types import SimpleNamespace
 
+import aiodns
 import pytest
 
 from dns_mcp_server.formatters import format_error_response
-from dns_mcp_server.resolvers import RESOLVER_CONFIGS, create_resolver
+from dns_mcp_server.resolvers import RESOLVER_CONFIGS
+
+# Outer bound on each real-network call, in case a tool's own timeout never fires
+_INTEGRATION_DEADLINE = 30
 
 
 class TestResolverConfigurations:
@@ -22,47 +28,40 @@ class TestResolverConfigurations:
             assert isinstance(RESOLVER_CONFIGS[resolver_type], list)
             assert len(RESOLVER_CONFIGS[resolver_type]) > 0
 
-    def test_google_resolver_config(self):
-        """Test Google resolver configuration"""
-        expected_nameservers = ["8.8.8.8", "8.8.4.4"]
-        assert RESOLVER_CONFIGS["google"] == expected_nameservers
-
-    def test_cloudflare_resolver_config(self):
-        """Test Cloudflare resolver configuration"""
-        expected_nameservers = ["1.1.1.1", "1.0.0.1"]
-        assert RESOLVER_CONFIGS["cloudflare"] == expected_nameservers
-
-    def test_public_resolver_config(self):
-        """Test public resolver configuration"""
-        expected_nameservers = ["8.8.8.8", "1.1.1.1", "9.9.9.9"]
-        assert RESOLVER_CONFIGS["public"] == expected_nameservers
+    @pytest.mark.parametrize(
+        ("resolver_type", "expected_nameservers"),
+        [
+            ("google", ["8.8.8.8", "8.8.4.4"]),
+            ("cloudflare", ["1.1.1.1", "1.0.0.1"]),
+            ("public", ["8.8.8.8", "1.1.1.1", "9.9.9.9"]),
+        ],
+    )
+    def test_resolver_config(self, resolver_type, expected_nameservers):
+        """Test predefined resolver nameserver configuration"""
+        assert RESOLVER_CONFIGS[resolver_type] == expected_nameservers
 
 
 class TestAsyncResolverCreation:
     """Test async resolver creation"""
 
-    def test_system_resolver_creation(self):
-        """Test system resolver creation"""
-        resolver = create_resolver(resolver_type="system")
-        assert resolver.resolver_type == "system"
-        assert resolver.resolver_id == "system"
+    @pytest.mark.parametrize("resolver_type", ["system", "google"])
+    def test_named_resolver_creation(self, cached_resolver, resolver_type):
+        """Test system and predefined resolver creation"""
+        resolver = cached_resolver(resolver_type=resolver_type)
+        assert resolver.resolver_type == resolver_type
+        assert resolver.resolver_id == resolver_type
+        if resolver_type in RESOLVER_CONFIGS:
+            assert resolver.resolver.nameservers == RESOLVER_CONFIGS[resolver_type]
 
-    def test_custom_nameserver_resolver(self):
+    def test_custom_nameserver_resolver(self, cached_resolver):
         """Test custom nameserver resolver creation"""
-        resolver = create_resolver(nameserver="8.8.8.8")
+        resolver = cached_resolver(nameserver="8.8.8.8")
         assert "custom" in resolver.resolver_id
 
-    def test_google_resolver_creation(self):
-        """Test Google resolver creation"""
-        resolver = create_resolver(resolver_type="google")
-        assert resolver.resolver_type == "google"
-        assert resolver.resolver_id == "google"
-        assert resolver.resolver.nameservers == RESOLVER_CONFIGS["google"]
-
-    def test_timeout_configuration(self):
+    def test_timeout_configuration(self, cached_resolver):
         """Test timeout configuration"""
         timeout = 30.0
-        resolver = create_resolver(timeout=timeout)
+        resolver = cached_resolver(timeout=timeout)
         assert resolver.timeout == timeout
         # Note: aiodns.DNSResolver.timeout may not be directly accessible
 
@@ -104,6 +103,45 @@ class TestErrorFormatting:
         assert result["type"] == "Timeout"
         assert "osint_insights" in result
 
+    def test_server_failure_and_refused_formatting(self):
+        """Test SERVFAIL and REFUSED error formatting"""
+        servfail = format_error_response(Exception("SERVFAIL"))
+        refused = format_error_response(Exception("REFUSED"))
+
+        assert servfail["error"] == "server_failure"
+        assert servfail["type"] == "SERVFAIL"
+        assert refused["error"] == "query_refused"
+        assert refused["type"] == "REFUSED"
+
+    def test_timeout_error_type_formatting(self):
+        """Test timeout classification from the exception type name"""
+
+        class LifetimeTimeout(Exception):
+            pass
+
+        result = format_error_response(LifetimeTimeout("query expired"))
+
+        assert result["error"] == "timeout"
+        assert result["details"] == "query expired"
+
+    def test_aiodns_error_code_formatting(self):
+        """Test aiodns errors are classified by their c-ares error code"""
+        nxdomain = format_error_response(
+            aiodns.error.DNSError(aiodns.error.ARES_ENOTFOUND, "Domain name not found")
+        )
+        no_answer = format_error_response(
+            aiodns.error.DNSError(
+                aiodns.error.ARES_ENODATA, "DNS server returned answer with no data"
+            )
+        )
+        refused = format_error_response(
+            aiodns.error.DNSError(aiodns.error.ARES_EREFUSED, "DNS server refused query")
+        )
+
+        assert nxdomain["type"] == "NXDOMAIN"
+        assert no_answer["type"] == "NoAnswer"
+        assert refused["type"] == "REFUSED"
+
     def test_generic_error_formatting(self):
         """Test generic error formatting"""
         error = ValueError("Invalid input")
@@ -116,30 +154,24 @@ class TestErrorFormatting:
         assert "timestamp" in result
 
 
+@pytest.fixture(scope="class")
+def resolver(cached_resolver):
+    """One resolver per test class; formatting never touches its channels"""
+    return cached_resolver()
+
+
 class TestRecordFormatting:
     """Test DNS record formatting (moved to resolver)"""
 
-    def test_mx_record_formatting(self):
+    def test_mx_record_formatting(self, resolver):
         """Test MX record formatting via resolver"""
-        resolver = create_resolver()
-
         # Test MX record with aiodns structure (priority/host)
-        class MockMXRecord:
-            def __init__(self, priority, host):
-                self.priority = priority
-                self.host = host
-
-        mx_record = MockMXRecord(10, "mail.example.com")
+        mx_record = SimpleNamespace(priority=10, host="mail.example.com")
         formatted = resolver._format_record("MX", mx_record)
         assert formatted == "10 mail.example.com"
 
         # Test MX record with RFC standard structure (preference/exchange)
-        class MockRFCMXRecord:
-            def __init__(self, preference, exchange):
-                self.preference = preference
-                self.exchange = exchange
-
-        rfc_mx_record = MockRFCMXRecord(20, "backup.example.com")
+        rfc_mx_record = SimpleNamespace(preference=20, exchange="backup.example.com")
         formatted_rfc = resolver._format_record("MX", rfc_mx_record)
         assert formatted_rfc == "20 backup.example.com"
 
@@ -152,21 +184,17 @@ class TestRecordFormatting:
         formatted_simple = resolver._format_record("MX", simple_mx_record)
         assert formatted_simple == "30 fallback.example.com"
 
-    def test_txt_record_formatting(self):
+    def test_txt_record_formatting(self, resolver):
         """Test TXT record formatting via resolver"""
-        resolver = create_resolver()
-
         # Mock TXT record with text attribute (matches aiodns structure)
-        class MockTXTRecord:
-            def __init__(self, text):
-                self.text = text
-
-        txt_record = MockTXTRecord("v=spf1 include:_spf.example.com ~all")
+        txt_record = SimpleNamespace(text="v=spf1 include:_spf.example.com ~all")
         formatted = resolver._format_record("TXT", txt_record)
         assert formatted == "v=spf1 include:_spf.example.com ~all"
 
         # Test TXT record with bytes text (can happen in real scenarios)
-        txt_record_bytes = MockTXTRecord(b"v=spf1 include:_spf.example.com ~all")
+        txt_record_bytes = SimpleNamespace(
+            text=b"v=spf1 include:_spf.example.com ~all"
+        )
         formatted_bytes = resolver._format_record("TXT", txt_record_bytes)
         assert formatted_bytes == "v=spf1 include:_spf.example.com ~all"
 
@@ -179,10 +207,8 @@ class TestRecordFormatting:
         formatted_simple = resolver._format_record("TXT", simple_txt_record)
         assert formatted_simple == "v=spf1 fallback test"
 
-    def test_a_record_formatting(self):
+    def test_a_record_formatting(self, resolver):
         """Test A record formatting via resolver"""
-        resolver = create_resolver()
-
         # Mock A record
         class MockARecord:
             def __str__(self):
@@ -204,8 +230,9 @@ class TestAsyncIntegration:
         from dns_mcp_server.core_tools import dns_query
 
         # Test with a well-known domain
-        result = await dns_query(
-            domain="sans.com", record_type="A", resolver_type="google"
+        result = await asyncio.wait_for(
+            dns_query(domain="sans.com", record_type="A", resolver_type="google"),
+            _INTEGRATION_DEADLINE,
         )
 
         assert "domain" in result
@@ -221,7 +248,10 @@ class TestAsyncIntegration:
         from dns_mcp_server.core_tools import dns_reverse_lookup
 
         # Test with Google's public DNS
-        result = await dns_reverse_lookup(ip="8.8.8.8", resolver_type="cloudflare")
+        result = await asyncio.wait_for(
+            dns_reverse_lookup(ip="8.8.8.8", resolver_type="cloudflare"),
+            _INTEGRATION_DEADLINE,
+        )
 
         assert "ip" in result
         assert result["ip"] == "8.8.8.8"
@@ -235,7 +265,10 @@ class TestAsyncIntegration:
         from dns_mcp_server.core_tools import dns_query_all
 
         # Test with a well-known domain
-        result = await dns_query_all(domain="hackthissite.org", resolver_type="quad9")
+        result = await asyncio.wait_for(
+            dns_query_all(domain="hackthissite.org", resolver_type="quad9"),
+            _INTEGRATION_DEADLINE,
+        )
 
         assert "domain" in result
         assert result["domain"] == "hackthissite.org"
@@ -251,8 +284,14 @@ class TestAsyncIntegration:
         from dns_mcp_server.bulk_tools import dns_bulk_query
 
         domains = ["sans.com", "hackthissite.org"]
-        result = await dns_bulk_query(
-            domains=domains, record_type="A", resolver_type="cloudflare", max_workers=2
+        result = await asyncio.wait_for(
+            dns_bulk_query(
+                domains=domains,
+                record_type="A",
+                resolver_type="cloudflare",
+                max_workers=2,
+            ),
+            _INTEGRATION_DEADLINE,
         )
 
         assert result["bulk_query"] is True
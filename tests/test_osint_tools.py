@@ -3,59 +3,130 @@ Tests for OSINT DNS analysis tools
 Testing propagation check, wildcard detection, and response time analysis
 """
 
-from unittest.mock import AsyncMock, patch
+import asyncio
+import itertools
+import statistics
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from dns_mcp_server.config import config
 from dns_mcp_server.osint_tools import (
     DEFAULT_PROPAGATION_RESOLVERS,
+    _time_stats,
     dns_propagation_check,
     dns_response_analysis,
     dns_wildcard_check,
 )
+from dns_mcp_server.resolvers import AsyncDNSResolver
+
+# Statistics every response time analysis must report
+_REQUIRED_TIME_STATS = frozenset({"min_time", "max_time", "avg_time", "median_time"})
+
+# Public DNS providers the default propagation set must cover
+_MAJOR_PROVIDERS = frozenset({"google", "cloudflare", "quad9"})
+
+# Outer bound on each real-network call, in case a tool's own timeout never fires
+_INTEGRATION_DEADLINE = 30
 
 
 class TestDNSPropagationCheck:
     """Test DNS propagation analysis across multiple resolvers"""
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_consistent_propagation(self, mock_create_resolver):
+    async def test_consistent_propagation(self, mock_resolver):
         """Test consistent DNS propagation across all resolvers"""
         # Mock resolver that returns consistent results
-        mock_resolver = AsyncMock()
         mock_resolver.query.return_value = ["192.168.1.1"]
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_propagation_check(domain="example.com", record_type="A")
 
         assert result["domain"] == "example.com"
         assert result["record_type"] == "A"
         assert result["is_consistent"] is True
+        assert result["partial"] is False
         assert result["unique_response_count"] == 1
         assert result["osint_analysis"]["consistency_status"] == "CONSISTENT"
         assert result["osint_analysis"]["trust_level"] == "HIGH"
         assert len(result["response_groups"]) == 1
         assert result["response_groups"][0]["records"] == ["192.168.1.1"]
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_inconsistent_propagation(self, mock_create_resolver):
+    async def test_record_order_does_not_split_groups(self, mock_resolver):
+        """Test the same record set in a different order counts as consistent"""
+        orderings = iter([["10.0.0.2", "10.0.0.1"], ["10.0.0.1", "10.0.0.2"]])
+
+        mock_resolver.query.side_effect = lambda domain, record_type: next(orderings)
+
+        result = await dns_propagation_check(
+            domain="example.com",
+            resolvers={"first": "192.0.2.1", "second": "192.0.2.2"},
+        )
+
+        assert result["is_consistent"] is True
+        assert result["response_groups"][0]["records"] == ["10.0.0.1", "10.0.0.2"]
+        assert result["response_groups"][0]["resolver_count"] == 2
+
+    @patch("aiodns.DNSResolver.query")
+    async def test_repeat_checks_bypass_answer_cache(self, mock_query):
+        """Test back-to-back checks each reach the resolvers instead of a cache"""
+        mock_record = Mock()
+        mock_record.host = "192.168.1.1"
+        mock_record.ttl = 300
+
+        async def mock_result(*args):
+            return [mock_record]
+
+        mock_query.side_effect = mock_result
+        resolvers = {"first": "192.0.2.1", "second": "192.0.2.2"}
+
+        for _ in range(2):
+            result = await dns_propagation_check(
+                domain="example.com", resolvers=resolvers
+            )
+            assert result["is_consistent"] is True
+
+        assert mock_query.call_count == 4
+
+    async def test_early_exit_on_disagreement(self, monkeypatch):
+        """Test early_exit returns once two resolvers disagree"""
+        answers = {"192.0.2.1": ["10.0.0.1"], "192.0.2.2": ["10.0.0.2"]}
+
+        def make_resolver(nameserver, resolver_type, timeout, use_cache):
+            async def mock_query(domain, record_type):
+                if nameserver not in answers:
+                    await asyncio.sleep(10)  # Slow resolver, cancelled early
+                return answers[nameserver]
+
+            mock_resolver = AsyncMock(spec=AsyncDNSResolver)
+            mock_resolver.query.side_effect = mock_query
+            return mock_resolver
+
+        monkeypatch.setattr("dns_mcp_server.osint_tools.create_resolver", make_resolver)
+
+        result = await asyncio.wait_for(
+            dns_propagation_check(
+                domain="c2-server.com",
+                resolvers={
+                    "first": "192.0.2.1",
+                    "second": "192.0.2.2",
+                    "slow": "192.0.2.3",
+                },
+                early_exit=True,
+            ),
+            timeout=5,
+        )
+
+        assert result["is_consistent"] is False
+        assert result["partial"] is True
+        assert list(result["resolver_results"]) == ["first", "second"]
+        assert result["total_resolvers_queried"] == 3
+
+    async def test_inconsistent_propagation(self, mock_resolver):
         """Test inconsistent DNS responses indicating potential issues"""
-        # Mock resolver that returns different results
-        call_count = 0
-
-        def mock_query_side_effect(domain, record_type):
-            nonlocal call_count
-            call_count += 1
-            if call_count <= 3:
-                return ["192.168.1.1"]
-            else:
-                return ["192.168.1.2"]  # Different IP
-
-        mock_resolver = AsyncMock()
-        mock_resolver.query.side_effect = mock_query_side_effect
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
+        # Mock resolver whose first 3 answers differ from the rest
+        mock_resolver.query.side_effect = itertools.chain(
+            itertools.repeat(["192.168.1.1"], 3),
+            itertools.repeat(["192.168.1.2"]),  # Different IP
+        )
 
         result = await dns_propagation_check(domain="suspicious.com", record_type="A")
 
@@ -87,14 +158,10 @@ class TestDNSPropagationCheck:
 class TestDNSWildcardCheck:
     """Test wildcard DNS detection"""
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_no_wildcard_detected(self, mock_create_resolver):
+    async def test_no_wildcard_detected(self, mock_resolver):
         """Test domain with no wildcard DNS"""
         # Mock resolver that raises exceptions (no wildcard)
-        mock_resolver = AsyncMock()
         mock_resolver.query.side_effect = Exception("NXDOMAIN")
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_wildcard_check(domain="specific.com", test_count=2)
 
@@ -108,44 +175,30 @@ class TestDNSWildcardCheck:
             in result["osint_insights"]["security_implications"][0]
         )
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_wildcard_detected(self, mock_create_resolver):
+    async def test_wildcard_detected(self, mock_resolver):
         """Test domain with wildcard DNS"""
         # Mock resolver that returns results for random subdomains
-        mock_resolver = AsyncMock()
         mock_resolver.query.return_value = ["192.168.1.100"]  # Wildcard response
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_wildcard_check(domain="wildcard.com", test_count=2)
 
         assert result["domain"] == "wildcard.com"
         assert result["has_wildcard"] is True
         assert result["wildcard_analysis"]["A"]["detected"] is True
+        assert result["wildcard_analysis"]["A"]["unique_records"] == ["192.168.1.100"]
+        assert result["wildcard_analysis"]["A"]["record_frequency"]["192.168.1.100"] >= 1
         assert result["osint_insights"]["risk_level"] in ["MEDIUM", "HIGH", "LOW"]
         assert (
             "All subdomains resolve to same target"
             in result["osint_insights"]["security_implications"]
         )
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_mixed_wildcard_response(self, mock_create_resolver):
+    async def test_mixed_wildcard_response(self, mock_resolver):
         """Test domain with mixed wildcard responses"""
-        # Mock resolver that sometimes fails, sometimes succeeds
-        call_count = 0
-
-        def mock_query_side_effect(domain, record_type):
-            nonlocal call_count
-            call_count += 1
-            if call_count % 2 == 0:
-                return ["192.168.1.100"]  # Some succeed
-            else:
-                raise Exception("NXDOMAIN")  # Some fail
-
-        mock_resolver = AsyncMock()
-        mock_resolver.query.side_effect = mock_query_side_effect
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
+        # Mock resolver that alternately fails and succeeds
+        mock_resolver.query.side_effect = itertools.cycle(
+            [Exception("NXDOMAIN"), ["192.168.1.100"]]
+        )
 
         result = await dns_wildcard_check(domain="partial.com", test_count=3)
 
@@ -153,43 +206,66 @@ class TestDNSWildcardCheck:
         assert result["domain"] == "partial.com"
         assert len(result["test_results"]) > 0
 
-    def test_random_subdomain_generation(self):
+    async def test_random_subdomain_generation(self, mock_resolver):
         """Test that random subdomains are properly generated"""
-        import string
+        mock_resolver.query.side_effect = Exception("NXDOMAIN")
 
-        # Mock secrets.choice to ensure reproducible test
-        with patch("dns_mcp_server.osint_tools.secrets.choice") as mock_choice:
-            mock_choice.return_value = "a"
+        await dns_wildcard_check(domain="example.com", test_count=3)
 
-            # Import the function that would use this mocked choice
-            # Since we can't easily test the internal function directly,
-            # we'll test that the subdomain generation creates expected patterns
-            from dns_mcp_server.config import config
+        queried = {call.args[0] for call in mock_resolver.query.call_args_list}
+        labels = {subdomain.removesuffix(".example.com") for subdomain in queried}
 
-            # Test the general pattern - this should create predictable subdomains for testing
-            test_subdomain = "".join(
-                mock_choice(string.ascii_lowercase + string.digits)
-                for _ in range(config.wildcard_subdomain_length)
-            )
+        # One distinct hex label per test subdomain, each of the configured length
+        assert len(labels) == 3
+        for label in labels:
+            assert len(label) == config.wildcard_subdomain_length
+            assert all(c in "0123456789abcdef" for c in label)
+
+    async def test_random_subdomain_labels_slice_pool(self, mock_resolver, monkeypatch):
+        """Test each subdomain label is its own slice of the random hex pool"""
+        mock_resolver.query.side_effect = Exception("NXDOMAIN")
+        # One run of a distinct character per label's stride in the pool
+        monkeypatch.setattr(
+            "dns_mcp_server.osint_tools.secrets.token_hex",
+            lambda nbytes: "".join(c * (nbytes * 2 // 3) for c in "abc"),
+        )
+
+        result = await dns_wildcard_check(domain="example.com", test_count=3)
+
+        length = config.wildcard_subdomain_length
+        assert result["test_subdomains"] == [
+            f"{c * length}.example.com" for c in "abc"
+        ]
+
+    async def test_wildcard_check_stops_at_verdict(self, mock_resolver):
+        """Test pending probes are cancelled once both record types are wildcards"""
+        answered = set()
+
+        async def mock_query(domain, record_type):
+            if record_type in answered:
+                await asyncio.sleep(10)  # Would stall the check if awaited
+            answered.add(record_type)
+            return ["192.168.1.100"]
+
+        mock_resolver.query.side_effect = mock_query
 
-            expected_subdomain = "a" * config.wildcard_subdomain_length
-            assert test_subdomain == expected_subdomain
+        result = await asyncio.wait_for(
+            dns_wildcard_check(domain="wildcard.com", test_count=3), timeout=5
+        )
 
-            # Verify choice was called the expected number of times
-            assert mock_choice.call_count == config.wildcard_subdomain_length
+        assert result["has_wildcard"] is True
+        assert result["test_count"] == 3
+        assert result["tests_completed"] == 2
+        assert result["wildcard_analysis"]["CNAME"]["detected"] is True
 
 
 class TestDNSResponseAnalysis:
     """Test DNS response time analysis"""
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_excellent_performance(self, mock_create_resolver):
+    async def test_excellent_performance(self, mock_resolver):
         """Test analysis with excellent response times"""
         # Mock resolver with fast, consistent responses
-        mock_resolver = AsyncMock()
         mock_resolver.query.return_value = ["192.168.1.1"]
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_response_analysis(
             domain="fast.com", iterations=5, record_type="A"
@@ -208,24 +284,12 @@ class TestDNSResponseAnalysis:
         ]
         assert result["osint_insights"]["anomaly_detection"] in ["DETECTED", "NONE"]
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_high_failure_rate(self, mock_create_resolver):
+    async def test_high_failure_rate(self, mock_resolver):
         """Test analysis with high failure rate"""
-        # Mock resolver that fails most of the time
-        call_count = 0
-
-        def mock_query_side_effect(domain, record_type):
-            nonlocal call_count
-            call_count += 1
-            if call_count <= 2:
-                return ["192.168.1.1"]  # Only first 2 succeed
-            else:
-                raise Exception("Timeout")  # Rest fail
-
-        mock_resolver = AsyncMock()
-        mock_resolver.query.side_effect = mock_query_side_effect
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
+        # Mock resolver where only the first 2 of 10 queries succeed
+        mock_resolver.query.side_effect = [["192.168.1.1"]] * 2 + [
+            Exception("Timeout")
+        ] * 8
 
         result = await dns_response_analysis(domain="unreliable.com", iterations=10)
 
@@ -233,15 +297,11 @@ class TestDNSResponseAnalysis:
         assert result["failure_rate"] == 0.8
         assert "High failure rate" in str(result["osint_insights"]["potential_issues"])
 
-    @patch("dns_mcp_server.osint_tools.create_resolver")
-    async def test_response_time_anomalies(self, mock_create_resolver):
+    async def test_response_time_anomalies(self, mock_resolver):
         """Test detection of response time anomalies"""
         # Mock resolver with variable response times
         # We'll simulate this by controlling the sleep delay in the actual function
-        mock_resolver = AsyncMock()
         mock_resolver.query.return_value = ["192.168.1.1"]
-        mock_resolver.resolver_id = "test_resolver"
-        mock_create_resolver.return_value = mock_resolver
 
         result = await dns_response_analysis(
             domain="variable.com",
@@ -253,10 +313,29 @@ class TestDNSResponseAnalysis:
         assert "response_time_analysis" in result
 
         # Check that analysis includes required statistical fields
-        analysis = result["response_time_analysis"]
-        required_fields = ["min_time", "max_time", "avg_time", "median_time"]
-        for field in required_fields:
-            assert field in analysis
+        assert _REQUIRED_TIME_STATS.issubset(result["response_time_analysis"])
+
+    async def test_iterations_run_concurrently(self, mock_resolver):
+        """Test iterations overlap while each keeps its own timing"""
+        in_flight = 0
+        peak_in_flight = 0
+
+        async def mock_query(domain, record_type):
+            nonlocal in_flight, peak_in_flight
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return ["192.168.1.1"]
+
+        mock_resolver.query.side_effect = mock_query
+
+        result = await dns_response_analysis(domain="pipelined.com", iterations=8)
+
+        assert result["successful_queries"] == 8
+        assert 1 < peak_in_flight <= config.response_analysis_concurrency
+        # Per-query timings exclude time spent waiting for a slot
+        assert result["response_time_analysis"]["max_time"] < 0.1
 
     async def test_empty_iterations(self):
         """Test response analysis with zero iterations"""
@@ -268,14 +347,31 @@ class TestDNSResponseAnalysis:
         assert result["failure_rate"] == 0.0
 
 
+class TestTimeStats:
+    """Test single-pass response time statistics"""
+
+    def test_matches_statistics_module(self):
+        """Test results agree with the statistics module"""
+        times = [0.021, 0.018, 0.35, 0.019, 0.025, 0.02]
+
+        min_time, max_time, mean, std_dev = _time_stats(times)
+
+        assert min_time == min(times)
+        assert max_time == max(times)
+        assert mean == pytest.approx(statistics.mean(times))
+        assert std_dev == pytest.approx(statistics.stdev(times))
+
+    def test_single_value(self):
+        """Test a single sample has no standard deviation"""
+        assert _time_stats([0.5]) == (0.5, 0.5, 0.5, None)
+
+
 class TestOSINTConfiguration:
     """Test OSINT tool configuration and defaults"""
 
     def test_default_propagation_resolvers(self):
         """Test that default resolvers are properly configured"""
-        assert "google" in DEFAULT_PROPAGATION_RESOLVERS
-        assert "cloudflare" in DEFAULT_PROPAGATION_RESOLVERS
-        assert "quad9" in DEFAULT_PROPAGATION_RESOLVERS
+        assert _MAJOR_PROVIDERS.issubset(DEFAULT_PROPAGATION_RESOLVERS)
         assert DEFAULT_PROPAGATION_RESOLVERS["google"] == "8.8.8.8"
         assert DEFAULT_PROPAGATION_RESOLVERS["cloudflare"] == "1.1.1.1"
 
@@ -285,52 +381,54 @@ class TestOSINTConfiguration:
         assert len(DEFAULT_PROPAGATION_RESOLVERS) >= 5
 
         # Should include major public DNS providers
-        expected_providers = ["google", "cloudflare", "quad9"]
-        for provider in expected_providers:
-            assert provider in DEFAULT_PROPAGATION_RESOLVERS
+        assert _MAJOR_PROVIDERS.issubset(DEFAULT_PROPAGATION_RESOLVERS)
 
 
 class TestOSINTIntegration:
     """Integration tests for OSINT tools with real domains"""
 
     @pytest.mark.integration
-    async def test_real_propagation_check(self):
-        """Test propagation check against real domain"""
-        result = await dns_propagation_check(
-            domain="sans.com", record_type="A", timeout=5
-        )
-
-        assert result["domain"] == "sans.com"
-        assert result["total_resolvers_queried"] > 0
-        assert "resolver_results" in result
-        assert "osint_analysis" in result
-
-    @pytest.mark.integration
-    async def test_real_wildcard_check(self):
-        """Test wildcard check against real domain"""
-        result = await dns_wildcard_check(
-            domain="hackthissite.org", test_count=2, timeout=5
-        )
-
-        assert result["domain"] == "hackthissite.org"
-        assert result["test_count"] == 2
-        assert len(result["test_subdomains"]) == 2
-        assert "osint_insights" in result
-
-    @pytest.mark.integration
-    async def test_real_response_analysis(self):
-        """Test response analysis against real domain"""
-        result = await dns_response_analysis(
-            domain="root-me.org",
-            iterations=3,  # Keep small for speed
-            record_type="A",
-            timeout=5,
+    async def test_real_osint_all_parallel(self):
+        """Test propagation, wildcard and response analysis against real domains"""
+        # Run concurrently so the test costs the slowest lookup, not the sum
+        propagation, wildcard, analysis = await asyncio.gather(
+            asyncio.wait_for(
+                dns_propagation_check(domain="sans.com", record_type="A", timeout=5),
+                _INTEGRATION_DEADLINE,
+            ),
+            asyncio.wait_for(
+                dns_wildcard_check(domain="hackthissite.org", test_count=2, timeout=5),
+                _INTEGRATION_DEADLINE,
+            ),
+            asyncio.wait_for(
+                dns_response_analysis(
+                    domain="root-me.org",
+                    iterations=3,  # Keep small for speed
+                    record_type="A",
+                    timeout=5,
+                ),
+                _INTEGRATION_DEADLINE,
+            ),
+            return_exceptions=True,
         )
 
-        assert result["domain"] == "root-me.org"
-        assert result["iterations"] == 3
-        assert "response_time_analysis" in result or result["failed_queries"] == 3
-        assert "osint_insights" in result
+        assert not isinstance(propagation, Exception), propagation
+        assert propagation["domain"] == "sans.com"
+        assert propagation["total_resolvers_queried"] > 0
+        assert "resolver_results" in propagation
+        assert "osint_analysis" in propagation
+
+        assert not isinstance(wildcard, Exception), wildcard
+        assert wildcard["domain"] == "hackthissite.org"
+        assert wildcard["test_count"] == 2
+        assert len(wildcard["test_subdomains"]) == 2
+        assert "osint_insights" in wildcard
+
+        assert not isinstance(analysis, Exception), analysis
+        assert analysis["domain"] == "root-me.org"
+        assert analysis["iterations"] == 3
+        assert "response_time_analysis" in analysis or analysis["failed_queries"] == 3
+        assert "osint_insights" in analysis
 
 
 # Test configuration